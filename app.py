@@ -5,8 +5,13 @@ from pathlib import Path
 # Add the current directory to the Python path
 sys.path.append(str(Path(__file__).parent))
 
-from modules import dashboard, upload_data, analytics, about, login, signup
+from utils.page_registry import load_page
+from utils.warm_up import start_warm_up
 from utils.styles import load_css
+from utils.session_data import (
+    get_scored_dataset, get_risk_summary, get_dataset_memory, restore_login_session,
+    attach_finished_job
+)
 
 # Page configuration
 st.set_page_config(
@@ -19,6 +24,13 @@ st.set_page_config(
 # Load custom CSS
 load_css()
 
+# Sign back in from the session token in the URL after a browser reload
+if restore_login_session():
+    st.session_state.page = 'Dashboard'
+
+# Pick up the result of a background scoring job that finished meanwhile
+attach_finished_job()
+
 # Initialize session state
 if 'page' not in st.session_state:
     if st.session_state.get('logged_in', False):
@@ -63,15 +75,18 @@ with st.sidebar:
     st.markdown("---")
     
     # Quick stats if data exists
-    if 'df' in st.session_state and st.session_state.df is not None:
+    df = get_scored_dataset()
+    if df is not None:
         st.markdown("### Quick Stats")
-        df = st.session_state.df
         st.metric("Total Students", len(df))
-        if 'Predicted_Score' in df.columns:
-            at_risk = len(df[df['Predicted_Score'] < 50])
-            st.metric("At-Risk Students", at_risk)
-            avg_score = round(df['Predicted_Score'].mean(), 1)
+        summary = get_risk_summary()
+        if summary is not None:
+            st.metric("At-Risk Students", summary['at_risk'])
+            avg_score = round(summary['mean_score'], 1)
             st.metric("Avg Score", f"{avg_score}%")
+        memory = get_dataset_memory()
+        shared = f", shared by {memory['sessions']} sessions" if memory['sessions'] > 1 else ""
+        st.caption(f"Session data in memory: {memory['bytes'] / 2**20:.1f} MB{shared}")
     
     st.markdown("---")
     st.markdown("""
@@ -95,28 +110,32 @@ if st.session_state.page == 'Auth':
     tab1, tab2 = st.tabs(["Sign In", "Create Account"])
     
     with tab1:
-        login.show()
+        load_page("login").show()
     
     with tab2:
-        signup.show()
+        load_page("signup").show()
         
 elif st.session_state.page == 'Dashboard':
     if st.session_state.get('logged_in', False):
-        dashboard.show()
+        load_page("dashboard").show()
     else:
         st.session_state.page = 'Auth'
         st.rerun()
 elif st.session_state.page == 'Upload':
     if st.session_state.get('logged_in', False):
-        upload_data.show()
+        load_page("upload_data").show()
     else:
         st.session_state.page = 'Auth'
         st.rerun()
 elif st.session_state.page == 'Analytics':
     if st.session_state.get('logged_in', False):
-        analytics.show()
+        load_page("analytics").show()
     else:
         st.session_state.page = 'Auth'
         st.rerun()
 elif st.session_state.page == 'About':
-    about.show()
\ No newline at end of file
+    load_page("about").show()
+
+# With the page on screen, warm up the rest of the app in the background
+# (already running when the server was started through serve.py)
+start_warm_up()
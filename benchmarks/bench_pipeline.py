@@ -0,0 +1,247 @@
+"""
+Benchmark the upload -> preprocess -> predict -> insight path.
+
+Generates synthetic rosters with create_sample_data(), then times each
+stage and measures its peak memory: the Python heap (tracemalloc) plus
+Arrow's memory pool, which tracemalloc can't see. Each roster is also
+uploaded as Parquet and checked to load the same data as the CSV upload.
+Results are written as JSON so runs from different releases can be compared:
+
+    python benchmarks/bench_pipeline.py --sizes 1000 100000 --output new.json
+    python benchmarks/bench_pipeline.py --sizes 1000 100000 --output new.json --compare old.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import sklearn
+
+from utils.correlation import CorrelationStats
+from utils.data_processing import (
+    bucket_risk_levels, create_sample_data, get_student_insights,
+    load_model, make_predictions, preprocess_data, read_student_csv, read_student_file
+)
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000, 10_000_000]
+
+
+def analytics_aggregations(df):
+    """
+    The aggregations the Advanced Analytics page runs on a scored dataset
+    """
+    scores = df['Predicted_Score']
+    stats = CorrelationStats().update(df)
+    stats.top_correlations('Predicted_Score', 5, stats.matrix())
+    scores.describe()
+    scores.quantile([0.25, 0.75])
+    df.groupby('Gender', observed=True)['Predicted_Score'].agg(['mean', 'std', 'count'])
+    df.groupby('Extracurricular_Activities', observed=True)['Predicted_Score'].agg(['mean', 'std', 'count'])
+
+
+def peak_arrow_bytes(func):
+    """
+    Peak bytes ``func()`` allocates from Arrow's memory pool (pyarrow CSV
+    parsing, Parquet/IPC decoding), which tracemalloc doesn't see
+    """
+    default_pool = pa.default_memory_pool()
+    pool = pa.proxy_memory_pool(default_pool)
+    pa.set_memory_pool(pool)
+    try:
+        func()
+    finally:
+        pa.set_memory_pool(default_pool)
+    return pool.max_memory()
+
+
+def measure(func, repeat):
+    """
+    Best wall time over ``repeat`` runs, then one traced run for the peak
+    Python heap (NumPy and pandas buffers included) and one for the peak
+    Arrow memory pool
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return result, min(timings), peak, peak_arrow_bytes(func)
+
+
+def check_parquet_upload(csv_bytes, parquet_bytes):
+    """
+    A Parquet upload must load the same columns, with the same categoricals,
+    as the same roster uploaded as CSV
+    """
+    from_csv = read_student_csv(csv_bytes)
+    from_parquet = read_student_file(parquet_bytes, "roster.parquet")
+    if set(from_parquet.columns) != set(from_csv.columns):
+        raise AssertionError(f"Parquet columns {list(from_parquet.columns)} != CSV columns {list(from_csv.columns)}")
+    from_parquet = from_parquet[from_csv.columns]
+    for col in from_csv.columns:
+        if isinstance(from_csv[col].dtype, pd.CategoricalDtype) != isinstance(from_parquet[col].dtype, pd.CategoricalDtype):
+            raise AssertionError(f"{col}: Parquet dtype {from_parquet[col].dtype} != CSV dtype {from_csv[col].dtype}")
+    pd.testing.assert_frame_equal(from_parquet, from_csv, check_dtype=False, check_categorical=False)
+
+
+def bench_size(n_rows, model, repeat, workdir):
+    """
+    Run every stage on a roster of ``n_rows`` students
+    """
+    roster = create_sample_data(n_students=n_rows)
+    csv_path = os.path.join(workdir, f"roster_{n_rows}.csv")
+    roster.to_csv(csv_path, index=False)
+    parquet_bytes = roster.to_parquet(index=False)
+    del roster
+
+    results = []
+
+    def record(stage, func):
+        result, seconds, heap, arrow = measure(func, repeat)
+        results.append({
+            'rows': n_rows,
+            'stage': stage,
+            'seconds': seconds,
+            'rows_per_second': n_rows / seconds if seconds > 0 else None,
+            # Upper bound: the two peaks need not coincide
+            'peak_bytes': heap + arrow,
+            'peak_heap_bytes': heap,
+            'peak_arrow_bytes': arrow,
+        })
+        print(f"{n_rows:>11,}  {stage:<24} {seconds * 1000:>10.1f} ms  {(heap + arrow) / 2**20:>9.1f} MiB"
+              f"  (arrow {arrow / 2**20:.1f} MiB)")
+        return result
+
+    with open(csv_path, "rb") as f:
+        csv_bytes = f.read()
+
+    # Plain pandas parse, kept for comparison with earlier results
+    record('read_csv', lambda: pd.read_csv(csv_path))
+    # The app's upload path: pyarrow engine, declared dtypes, column projection
+    df = record('read_student_csv', lambda: read_student_csv(csv_bytes))
+    record('read_parquet', lambda: read_student_file(parquet_bytes, "roster.parquet"))
+    check_parquet_upload(csv_bytes, parquet_bytes)
+    df_processed = record('preprocess_data', lambda: preprocess_data(df))
+    scores = record('make_predictions', lambda: make_predictions(df_processed, model))
+    buckets = record('risk_categorization', lambda: bucket_risk_levels(scores))
+
+    df['Predicted_Score'] = scores
+    df['Risk_Level'] = pd.Series(buckets['levels'], index=df.index)
+    df['Risk_Icon'] = pd.Series(buckets['icons'], index=df.index)
+
+    record('get_student_insights', lambda: get_student_insights(df))
+    record('analytics_aggregations', lambda: analytics_aggregations(df))
+
+    os.remove(csv_path)
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_baseline(baseline_path):
+    """
+    Results of a previous run, keyed by (rows, stage)
+    """
+    with open(baseline_path) as f:
+        return {(r['rows'], r['stage']): r for r in json.load(f)['results']}
+
+
+def compare(results, baseline, baseline_path):
+    """
+    Print the time and memory ratio of each stage against a previous run
+    """
+    print(f"\nCompared with {baseline_path} (ratio < 1.0 is better):")
+    for result in results:
+        old = baseline.get((result['rows'], result['stage']))
+        if old is None:
+            continue
+        time_ratio = result['seconds'] / old['seconds'] if old['seconds'] else float('nan')
+        memory_ratio = result['peak_bytes'] / old['peak_bytes'] if old['peak_bytes'] else float('nan')
+        print(f"{result['rows']:>11,}  {result['stage']:<24} time x{time_ratio:.2f}  memory x{memory_ratio:.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Roster sizes to benchmark (default: 1k 100k 1M 10M)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Timed runs per stage; the best one is reported")
+    parser.add_argument("--output", default="bench_results.json",
+                        help="Where to write the JSON results")
+    parser.add_argument("--compare", metavar="BASELINE_JSON",
+                        help="Previous results file to compare against")
+    args = parser.parse_args(argv)
+    output = os.path.abspath(args.output)
+    baseline_path = os.path.abspath(args.compare) if args.compare else None
+    if baseline_path == output:
+        parser.error("--output must not overwrite the --compare baseline")
+    # Read before anything is written, so the baseline is the previous run
+    baseline = load_baseline(baseline_path) if baseline_path else None
+
+    # model.pkl and preprocessor.pkl are resolved relative to the project root
+    os.chdir(ROOT)
+    warnings.filterwarnings("ignore", module="sklearn")
+    model = load_model()
+    if model is None:
+        return 1
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for n_rows in args.sizes:
+            results.extend(bench_size(n_rows, model, args.repeat, workdir))
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'scikit_learn': sklearn.__version__,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if baseline is not None:
+        compare(results, baseline, baseline_path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,56 +1,209 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import joblib
 import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_squared_error, r2_score
-from sklearn.preprocessing import LabelEncoder
+from utils.data_processing import (
+    fit_preprocessor, preprocess_data, load_model, stream_predictions, RISK_LEVELS
+)
+
+
+def train():
+    # Load the dataset
+    df = pd.read_csv("dataset/student_performance_dataset.csv")
+
+    # Fit the preprocessing artifact (binary maps, category vocabularies,
+    # feature column order) and apply it; Student_ID and Pass_Fail stay in df
+    preprocessor = fit_preprocessor(df)
+    X = preprocess_data(df, preprocessor)
+    y = df["Final_Exam_Score"]
+
+    # Split the data
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    # Train the model
+    model = LinearRegression()
+    model.fit(X_train, y_train)
+
+    # Predict
+    y_pred = model.predict(X_test)
+
+    # Evaluate
+    rmse = np.sqrt(mean_squared_error(y_test, y_pred))
+    r2 = r2_score(y_test, y_pred)
+
+    print("Model Evaluation:")
+    print(f"R² Score: {r2:.2f}")
+    print(f"RMSE: {rmse:.2f}")
+
+    # Predict on full dataset
+    df["Predicted_Score"] = model.predict(X)
+
+    # Flag students at risk
+    at_risk = df[df["Predicted_Score"] < 50]
+
+    # Show relevant info
+    print("\nStudents predicted to score below 50:")
+    print(at_risk[["Student_ID", "Predicted_Score", "Pass_Fail"]])
+
+
+    # Save the model and the preprocessing it was trained with
+    joblib.dump(model, "model.pkl")
+    joblib.dump(preprocessor, "preprocessor.pkl")
+    print("Model saved as model.pkl")
+    print("Preprocessor saved as preprocessor.pkl")
+
+
+def find_rosters(inputs):
+    """
+    Expand directories (every *.csv inside), glob patterns and file paths
+    """
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(sorted(glob.glob(os.path.join(item, "*.csv"))))
+        elif glob.has_magic(item):
+            paths.extend(sorted(glob.glob(item, recursive=True)))
+        else:
+            paths.append(item)
+    # Keep the first occurrence of each file
+    return list(dict.fromkeys(os.path.abspath(path) for path in paths))
+
+
+def output_names(paths):
+    """
+    Output name of each roster: its path relative to the inputs' common
+    directory, without the extension, so same-named files in different
+    directories (schoolA/roster.csv, schoolB/roster.csv) don't overwrite
+    each other
+    """
+    root = os.path.commonpath([os.path.dirname(path) for path in paths])
+    names = {path: os.path.splitext(os.path.relpath(path, root))[0] for path in paths}
+    seen = {}
+    for path, name in names.items():
+        # Case-insensitive file systems would still map these to one output
+        other = seen.setdefault(name.lower(), path)
+        if other != path:
+            raise ValueError(f"{other} and {path} would both be written to {name}_scored.csv")
+    return names
+
+
+_worker_model = None
+
+
+def _init_worker():
+    # Each worker process unpickles the model once and reuses it for every file
+    global _worker_model
+    _worker_model = load_model()
+    if _worker_model is None:
+        raise FileNotFoundError("model.pkl not found")
 
-# Load the dataset
-df = pd.read_csv("dataset/student_performance_dataset.csv")
 
-# Keep Student_ID and Pass_Fail for later reference
-# Encode binary categorical columns
-binary_cols = ["Gender", "Internet_Access_at_Home", "Extracurricular_Activities"]
-for col in binary_cols:
-    df[col] = df[col].map({'Yes': 1, 'No': 0, 'Male': 0, 'Female': 1})
+def score_roster(path, output_dir, chunksize, name):
+    """
+    Score one CSV in streaming mode into ``<output_dir>/<name>_scored.csv``;
+    returns its risk summary
+    """
+    output_path = os.path.join(output_dir, f"{name}_scored.csv")
+    start = time.perf_counter()
+    try:
+        # Files are already spread over processes, so score each one on a single thread
+        result = stream_predictions(path, _worker_model, chunksize=chunksize, output=output_path, n_jobs=1)
+    except Exception as e:
+        # Don't leave a half-written output behind for a roster that failed
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        return {'input': path, 'status': 'error', 'error': str(e)}
 
-# Encode 'Parental_Education_Level'
-df["Parental_Education_Level"] = LabelEncoder().fit_transform(df["Parental_Education_Level"])
+    scores = result['scores']
+    summary = {
+        'input': path,
+        'status': 'ok',
+        'output': output_path,
+        'rows': result['rows'],
+        'avg_score': round(float(scores.mean()), 2) if len(scores) else None,
+        'at_risk': result['risk_counts']['High Risk'] + result['risk_counts']['Moderate Risk'],
+        'risk_counts': result['risk_counts'],
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+    with open(os.path.join(output_dir, f"{name}_summary.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+    return summary
 
-# Define features (exclude Student_ID, Pass_Fail, Final_Exam_Score)
-X = df.drop(["Student_ID", "Pass_Fail", "Final_Exam_Score"], axis=1)
-y = df["Final_Exam_Score"]
 
-# Split the data
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+def score(inputs, output_dir, workers=None, chunksize=50_000):
+    """
+    Score many roster CSVs in parallel across a process pool
+    """
+    paths = find_rosters(inputs)
+    if not paths:
+        print("No CSV files matched.")
+        return 1
+    try:
+        names = output_names(paths)
+    except ValueError as e:
+        print(e)
+        return 1
+    # Rosters from subdirectories keep their layout under output_dir
+    for name in names.values():
+        os.makedirs(os.path.join(output_dir, os.path.dirname(name)), exist_ok=True)
 
-# Train the model
-model = LinearRegression()
-model.fit(X_train, y_train)
+    summaries = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(score_roster, path, output_dir, chunksize, names[path]) for path in paths]
+        for future in as_completed(futures):
+            summary = future.result()
+            summaries.append(summary)
+            if summary['status'] == 'ok':
+                print(f"{summary['input']}: {summary['rows']} students, "
+                      f"{summary['at_risk']} at risk ({summary['seconds']}s)")
+            else:
+                print(f"{summary['input']}: FAILED - {summary['error']}")
 
-# Predict
-y_pred = model.predict(X_test)
+    summaries.sort(key=lambda s: s['input'])
+    succeeded = [s for s in summaries if s['status'] == 'ok']
+    totals = {level: sum(s['risk_counts'][level] for s in succeeded) for level in RISK_LEVELS}
+    with open(os.path.join(output_dir, "batch_summary.json"), "w") as f:
+        json.dump({
+            'files': len(summaries),
+            'failed': len(summaries) - len(succeeded),
+            'rows': sum(s['rows'] for s in succeeded),
+            'risk_counts': totals,
+            'results': summaries,
+        }, f, indent=2)
 
-# Evaluate
-rmse = np.sqrt(mean_squared_error(y_test, y_pred))
-r2 = r2_score(y_test, y_pred)
+    print(f"\nScored {len(succeeded)}/{len(summaries)} files into {output_dir}")
+    return 0 if len(succeeded) == len(summaries) else 1
 
-print("Model Evaluation:")
-print(f"R² Score: {r2:.2f}")
-print(f"RMSE: {rmse:.2f}")
 
-# Predict on full dataset
-df["Predicted_Score"] = model.predict(X)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the EduPredict model or batch-score rosters")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("train", help="Train and save model.pkl (default)")
 
-# Flag students at risk
-at_risk = df[df["Predicted_Score"] < 50]
+    score_parser = subparsers.add_parser("score", help="Score roster CSVs in parallel")
+    score_parser.add_argument("inputs", nargs="+", help="CSV files, directories or glob patterns")
+    score_parser.add_argument("-o", "--output-dir", default="scored", help="Where to write results")
+    score_parser.add_argument("-w", "--workers", type=int, default=None,
+                              help="Worker processes (default: one per CPU)")
+    score_parser.add_argument("--chunksize", type=int, default=50_000,
+                              help="Rows read per chunk for each file")
 
-# Show relevant info
-print("\nStudents predicted to score below 50:")
-print(at_risk[["Student_ID", "Predicted_Score", "Pass_Fail"]])
+    args = parser.parse_args(argv)
+    if args.command == "score":
+        return score(args.inputs, args.output_dir, args.workers, args.chunksize)
+    train()
+    return 0
 
 
-# Save the model
-joblib.dump(model, "model.pkl")
-print("Model saved as model.pkl")
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,7 @@
 import streamlit as st
+import os
+from utils.data_processing import get_model_stats
+from utils.warm_up import warm_up
 
 def show():
     # Main header
@@ -124,12 +127,11 @@ def show():
             <h4>Required Columns</h4>
             <ul style="text-align: left;">
                 <li><strong>Student_ID:</strong> Unique identifier</li>
-                <li><strong>Age:</strong> Student age (16-20)</li>
                 <li><strong>Gender:</strong> Male/Female</li>
                 <li><strong>Study_Hours_per_Week:</strong> Weekly study hours</li>
                 <li><strong>Attendance_Rate:</strong> Attendance percentage (0-100)</li>
-                <li><strong>Previous_Grade:</strong> Previous academic grade (A/B/C/D)</li>
-                <li><strong>Parental_Education_Level:</strong> Parent education level</li>
+                <li><strong>Past_Exam_Scores:</strong> Score on previous exams (0-100)</li>
+                <li><strong>Parental_Education_Level:</strong> High School/Bachelors/Masters/PhD</li>
                 <li><strong>Internet_Access_at_Home:</strong> Yes/No</li>
                 <li><strong>Extracurricular_Activities:</strong> Yes/No</li>
             </ul>
@@ -150,6 +152,7 @@ def show():
             <h4>Supported Formats</h4>
             <ul style="text-align: left;">
                 <li>CSV files (.csv)</li>
+                <li>Parquet and Arrow/Feather files (.parquet, .arrow, .feather)</li>
                 <li>UTF-8 encoding recommended</li>
                 <li>Header row required</li>
                 <li>Maximum 10,000 rows</li>
@@ -235,6 +238,23 @@ def show():
         </div>
         """, unsafe_allow_html=True)
     
+    model_stats = get_model_stats()
+    if model_stats:
+        with st.expander("Model Cache Status", expanded=False):
+            for path, stats in model_stats.items():
+                last_load_ms = (stats['last_load_seconds'] or 0) * 1000
+                st.markdown(
+                    f"**{os.path.basename(path)}** (version `{stats['version'][:12]}`): "
+                    f"loaded {stats['loads']}x, served from cache {stats['hits']}x, "
+                    f"last load {last_load_ms:.1f} ms"
+                )
+            
+            warm_up_status = warm_up.status()
+            if warm_up_status['timings_seconds']:
+                steps = ", ".join(f"{name} {seconds * 1000:.0f} ms"
+                                  for name, seconds in warm_up_status['timings_seconds'].items())
+                st.markdown(f"**Warm-up** ({'ready' if warm_up_status['ready'] else 'in progress'}): {steps}")
+    
     # Privacy and security
     st.markdown('<p class="section-header">Privacy & Security</p>', unsafe_allow_html=True)
     
@@ -1,14 +1,18 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+import matplotlib as mpl
 import seaborn as sns
 
 # Set matplotlib style for better plots
-plt.style.use('default')
+mpl.style.use('default')
 sns.set_palette("husl")
 
 from utils.data_processing import get_student_insights
+from utils.session_data import get_scored_dataset, get_risk_summary, get_dataset_version
+from utils.figure_renderer import render_figures
+from utils.correlation import get_correlation_stats
+from utils.styles import info_card
 
 def show():
     # Main header
@@ -20,18 +24,16 @@ def show():
     """, unsafe_allow_html=True)
     
     # Check if data exists
-    if 'df' not in st.session_state or st.session_state.df is None:
-        st.markdown("""
-        <div class="info-card warning-card">
-            <h3>No Data Available</h3>
-            <p>Please upload student data first to view advanced analytics.</p>
-            <p>Navigate to the <strong>"Upload & Analyze"</strong> page to get started.</p>
-        </div>
-        """, unsafe_allow_html=True)
+    df = get_scored_dataset()
+    if df is None:
+        st.markdown(info_card(
+            "No Data Available",
+            "Please upload student data first to view advanced analytics.",
+            'Navigate to the <strong>"Upload & Analyze"</strong> page to get started.',
+            variant="warning", heading="h3"
+        ), unsafe_allow_html=True)
         return
     
-    df = st.session_state.df
-    
     if 'Predicted_Score' not in df.columns:
         st.warning("Predictions not available. Please re-upload your data.")
         return
@@ -60,22 +62,19 @@ def show_performance_analysis(df):
     """Show detailed performance analysis using matplotlib"""
     st.markdown("### Performance Distribution Analysis")
     
-    col1, col2 = st.columns(2)
-    
-    with col1:
+    def draw_score_boxplot(fig):
         # Box plot for score distribution
-        fig, ax = plt.subplots(figsize=(8, 6))
+        ax = fig.subplots()
         ax.boxplot(df['Predicted_Score'], vert=True)
         ax.axhline(y=50, color='red', linestyle='--', label='Pass Threshold')
         ax.set_ylabel('Predicted Score')
         ax.set_title('Score Distribution (Box Plot)')
         ax.legend()
         ax.grid(True, alpha=0.3)
-        st.pyplot(fig)
     
-    with col2:
+    def draw_score_histogram(fig):
         # Histogram for detailed distribution
-        fig, ax = plt.subplots(figsize=(8, 6))
+        ax = fig.subplots()
         ax.hist(df['Predicted_Score'], bins=20, color='skyblue', alpha=0.7, edgecolor='black')
         ax.axvline(x=50, color='red', linestyle='--', label='Pass Threshold')
         ax.set_xlabel('Predicted Score')
@@ -83,7 +82,53 @@ def show_performance_analysis(df):
         ax.set_title('Detailed Score Distribution')
         ax.legend()
         ax.grid(True, alpha=0.3)
-        st.pyplot(fig)
+    
+    def draw_study_hours_scatter(fig):
+        # Scatter plot
+        ax = fig.subplots()
+        scatter = ax.scatter(df['Study_Hours_per_Week'], df['Predicted_Score'], 
+                           c=df['Predicted_Score'], cmap='viridis', alpha=0.6)
+        ax.set_xlabel('Study Hours per Week')
+        ax.set_ylabel('Predicted Score')
+        ax.set_title('Study Hours vs Predicted Score')
+        fig.colorbar(scatter, ax=ax, label='Score')
+        ax.grid(True, alpha=0.3)
+    
+    def draw_study_hours_boxplot(fig):
+        # Box plot by study hour bins
+        # Build the binned frame locally; the session dataset is shared and read-only
+        binned_df = pd.DataFrame({
+            'Predicted_Score': df['Predicted_Score'],
+            'Study_Hours_Bin': pd.cut(df['Study_Hours_per_Week'], 
+                                      bins=[0, 10, 20, 30, 100], 
+                                      labels=['0-10h', '11-20h', '21-30h', '30h+'])
+        })
+        
+        ax = fig.subplots()
+        binned_df.boxplot(column='Predicted_Score', by='Study_Hours_Bin', ax=ax)
+        ax.set_xlabel('Study Hours Bin')
+        ax.set_ylabel('Predicted Score')
+        ax.set_title('Score Distribution by Study Hours')
+        fig.suptitle('')  # Remove default title
+    
+    charts = [
+        ('performance_boxplot', draw_score_boxplot, (8, 6)),
+        ('performance_histogram', draw_score_histogram, (8, 6)),
+    ]
+    if 'Study_Hours_per_Week' in df.columns:
+        charts += [
+            ('study_hours_scatter', draw_study_hours_scatter, (8, 6)),
+            ('study_hours_boxplot', draw_study_hours_boxplot, (8, 6)),
+        ]
+    pngs = render_figures(get_dataset_version(), charts)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.image(pngs['performance_boxplot'])
+    
+    with col2:
+        st.image(pngs['performance_histogram'])
     
     # Performance by study hours
     if 'Study_Hours_per_Week' in df.columns:
@@ -92,59 +137,54 @@ def show_performance_analysis(df):
         col1, col2 = st.columns(2)
         
         with col1:
-            # Scatter plot
-            fig, ax = plt.subplots(figsize=(8, 6))
-            scatter = ax.scatter(df['Study_Hours_per_Week'], df['Predicted_Score'], 
-                               c=df['Predicted_Score'], cmap='viridis', alpha=0.6)
-            ax.set_xlabel('Study Hours per Week')
-            ax.set_ylabel('Predicted Score')
-            ax.set_title('Study Hours vs Predicted Score')
-            plt.colorbar(scatter, ax=ax, label='Score')
-            ax.grid(True, alpha=0.3)
-            st.pyplot(fig)
+            st.image(pngs['study_hours_scatter'])
         
         with col2:
-            # Box plot by study hour bins
-            df['Study_Hours_Bin'] = pd.cut(df['Study_Hours_per_Week'], 
-                                          bins=[0, 10, 20, 30, 100], 
-                                          labels=['0-10h', '11-20h', '21-30h', '30h+'])
-            
-            fig, ax = plt.subplots(figsize=(8, 6))
-            df.boxplot(column='Predicted_Score', by='Study_Hours_Bin', ax=ax)
-            ax.set_xlabel('Study Hours Bin')
-            ax.set_ylabel('Predicted Score')
-            ax.set_title('Score Distribution by Study Hours')
-            plt.suptitle('')  # Remove default title
-            st.pyplot(fig)
+            st.image(pngs['study_hours_boxplot'])
 
 def show_correlation_analysis(df):
     """Show correlation analysis between variables"""
     st.markdown("### Variable Correlation Analysis")
     
-    # Select numeric columns for correlation
-    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    # Sufficient statistics over the numeric columns, built once per dataset
+    corr_stats = get_correlation_stats(get_dataset_version(), df)
     
-    if len(numeric_cols) > 1:
+    if len(corr_stats.columns) > 1:
         # Correlation matrix
-        corr_matrix = df[numeric_cols].corr()
-        
-        # Create correlation heatmap
-        fig, ax = plt.subplots(figsize=(10, 8))
-        sns.heatmap(corr_matrix, annot=True, cmap='RdBu_r', center=0, 
-                   square=True, fmt='.2f', ax=ax)
-        ax.set_title('Correlation Matrix of Numeric Variables')
-        st.pyplot(fig)
+        corr_matrix = corr_stats.matrix()
         
         # Top correlations with predicted score
+        top_predictors = None
         if 'Predicted_Score' in corr_matrix.columns:
-            score_correlations = corr_matrix['Predicted_Score'].abs().sort_values(ascending=False)
-            score_correlations = score_correlations[score_correlations.index != 'Predicted_Score']
-            
+            top_predictors = corr_stats.top_correlations('Predicted_Score', 5, corr_matrix)
+        
+        def draw_heatmap(fig):
+            # Create correlation heatmap
+            ax = fig.subplots()
+            sns.heatmap(corr_matrix, annot=True, cmap='RdBu_r', center=0, 
+                       square=True, fmt='.2f', ax=ax)
+            ax.set_title('Correlation Matrix of Numeric Variables')
+        
+        def draw_top_predictors(fig):
+            # Correlation bar chart
+            ax = fig.subplots()
+            top_predictors.plot(kind='barh', ax=ax, color='steelblue')
+            ax.set_xlabel('Correlation Strength')
+            ax.set_title('Top 5 Correlations with Predicted Score')
+            ax.grid(True, alpha=0.3)
+        
+        charts = [('correlation_heatmap', draw_heatmap, (10, 8))]
+        if top_predictors is not None:
+            charts.append(('correlation_top_predictors', draw_top_predictors, (8, 6)))
+        pngs = render_figures(get_dataset_version(), charts)
+        
+        st.image(pngs['correlation_heatmap'])
+        
+        if top_predictors is not None:
             col1, col2 = st.columns(2)
             
             with col1:
                 st.markdown("#### Strongest Predictors")
-                top_predictors = score_correlations.head(5)
                 
                 for var, corr in top_predictors.items():
                     correlation_strength = "Strong" if corr > 0.7 else "Moderate" if corr > 0.4 else "Weak"
@@ -155,13 +195,7 @@ def show_correlation_analysis(df):
                     )
             
             with col2:
-                # Correlation bar chart
-                fig, ax = plt.subplots(figsize=(8, 6))
-                top_predictors.head(5).plot(kind='barh', ax=ax, color='steelblue')
-                ax.set_xlabel('Correlation Strength')
-                ax.set_title('Top 5 Correlations with Predicted Score')
-                ax.grid(True, alpha=0.3)
-                st.pyplot(fig)
+                st.image(pngs['correlation_top_predictors'])
     else:
         st.info("Not enough numeric variables for correlation analysis.")
 
@@ -169,32 +203,30 @@ def show_demographic_insights(df):
     """Show demographic analysis"""
     st.markdown("### Demographic Performance Analysis")
     
-    # Gender analysis
+    # Readable group labels next to the scores, without copying the whole dataset
+    charts = []
+    
     if 'Gender' in df.columns:
-        st.markdown("#### Performance by Gender")
-        
         # Convert gender encoding back to readable format
-        df_display = df.copy()
+        gender = df['Gender']
         if df['Gender'].dtype in ['int64', 'float64']:
-            df_display['Gender'] = df_display['Gender'].map({0: 'Male', 1: 'Female'})
+            gender = gender.map({0: 'Male', 1: 'Female'})
+        gender_df = pd.DataFrame({'Predicted_Score': df['Predicted_Score'], 'Gender': gender})
         
-        col1, col2 = st.columns(2)
+        # Gender statistics
+        gender_stats = gender_df.groupby('Gender')['Predicted_Score'].agg(['mean', 'std', 'count']).round(2)
         
-        with col1:
+        def draw_gender_boxplot(fig):
             # Box plot by gender
-            fig, ax = plt.subplots(figsize=(8, 6))
-            df_display.boxplot(column='Predicted_Score', by='Gender', ax=ax)
+            ax = fig.subplots()
+            gender_df.boxplot(column='Predicted_Score', by='Gender', ax=ax)
             ax.set_xlabel('Gender')
             ax.set_ylabel('Predicted Score')
             ax.set_title('Score Distribution by Gender')
-            plt.suptitle('')  # Remove default title
-            st.pyplot(fig)
+            fig.suptitle('')  # Remove default title
         
-        with col2:
-            # Gender statistics
-            gender_stats = df_display.groupby('Gender')['Predicted_Score'].agg(['mean', 'std', 'count']).round(2)
-            
-            fig, ax = plt.subplots(figsize=(8, 6))
+        def draw_gender_means(fig):
+            ax = fig.subplots()
             gender_stats['mean'].plot(kind='bar', ax=ax, color=['lightblue', 'lightcoral'], 
                                     yerr=gender_stats['std'], capsize=4)
             ax.set_xlabel('Gender')
@@ -202,29 +234,53 @@ def show_demographic_insights(df):
             ax.set_title('Average Score by Gender')
             ax.tick_params(axis='x', rotation=0)
             ax.grid(True, alpha=0.3)
-            st.pyplot(fig)
+        
+        charts += [
+            ('gender_boxplot', draw_gender_boxplot, (8, 6)),
+            ('gender_means', draw_gender_means, (8, 6)),
+        ]
+    
+    if 'Extracurricular_Activities' in df.columns:
+        extra = df['Extracurricular_Activities']
+        if df['Extracurricular_Activities'].dtype in ['int64', 'float64']:
+            extra = extra.map({0: 'No', 1: 'Yes'})
+        extra_df = pd.DataFrame({'Predicted_Score': df['Predicted_Score'], 'Extracurricular_Activities': extra})
+        
+        def draw_extracurricular_boxplot(fig):
+            ax = fig.subplots()
+            extra_df.boxplot(column='Predicted_Score', by='Extracurricular_Activities', ax=ax)
+            ax.set_xlabel('Extracurricular Activities')
+            ax.set_ylabel('Predicted Score')
+            ax.set_title('Score Distribution by Extracurricular Participation')
+            fig.suptitle('')  # Remove default title
+        
+        charts.append(('extracurricular_boxplot', draw_extracurricular_boxplot, (8, 6)))
+    
+    pngs = render_figures(get_dataset_version(), charts)
+    
+    # Gender analysis
+    if 'Gender' in df.columns:
+        st.markdown("#### Performance by Gender")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.image(pngs['gender_boxplot'])
+        
+        with col2:
+            st.image(pngs['gender_means'])
     
     # Extracurricular activities analysis
     if 'Extracurricular_Activities' in df.columns:
         st.markdown("#### 🏃‍♂️ Impact of Extracurricular Activities")
         
-        df_display = df.copy()
-        if df['Extracurricular_Activities'].dtype in ['int64', 'float64']:
-            df_display['Extracurricular_Activities'] = df_display['Extracurricular_Activities'].map({0: 'No', 1: 'Yes'})
-        
         col1, col2 = st.columns(2)
         
         with col1:
-            fig, ax = plt.subplots(figsize=(8, 6))
-            df_display.boxplot(column='Predicted_Score', by='Extracurricular_Activities', ax=ax)
-            ax.set_xlabel('Extracurricular Activities')
-            ax.set_ylabel('Predicted Score')
-            ax.set_title('Score Distribution by Extracurricular Participation')
-            plt.suptitle('')  # Remove default title
-            st.pyplot(fig)
+            st.image(pngs['extracurricular_boxplot'])
         
         with col2:
-            extra_stats = df_display.groupby('Extracurricular_Activities')['Predicted_Score'].agg(['mean', 'std', 'count']).round(2)
+            extra_stats = extra_df.groupby('Extracurricular_Activities')['Predicted_Score'].agg(['mean', 'std', 'count']).round(2)
             
             # Calculate the difference
             if len(extra_stats) == 2:
@@ -239,6 +295,7 @@ def show_demographic_insights(df):
 
 def show_statistical_summary(df):
     """Show statistical summary and insights"""
+    summary = get_risk_summary()
     st.markdown("### Statistical Summary")
     
     # Basic statistics
@@ -262,11 +319,11 @@ def show_statistical_summary(df):
         st.markdown("#### 🎯 Performance Categories")
         
         # Risk level distribution
-        high_risk = len(df[df['Predicted_Score'] < 40])
-        moderate_risk = len(df[(df['Predicted_Score'] >= 40) & (df['Predicted_Score'] < 50)])
-        low_risk = len(df[(df['Predicted_Score'] >= 50) & (df['Predicted_Score'] < 70)])
-        excellent = len(df[df['Predicted_Score'] >= 70])
-        total = len(df)
+        high_risk = summary['high_risk']
+        moderate_risk = summary['moderate_risk']
+        low_risk = summary['low_risk']
+        excellent = summary['excellent']
+        total = summary['total_students']
         
         categories_df = pd.DataFrame({
             'Category': ['High Risk (<40)', 'Moderate Risk (40-50)', 'Low Risk (50-70)', 'Excellent (70+)'],
@@ -284,25 +341,28 @@ def show_statistical_summary(df):
     
     with col1:
         # Simple histogram with normal curve overlay
-        fig, ax = plt.subplots(figsize=(8, 6))
-        
-        # Plot histogram
-        n, bins, patches = ax.hist(df['Predicted_Score'], bins=20, density=True, 
-                                  alpha=0.7, color='skyblue', edgecolor='black')
-        
-        # Plot normal distribution curve
-        mu, sigma = df['Predicted_Score'].mean(), df['Predicted_Score'].std()
-        x = np.linspace(df['Predicted_Score'].min(), df['Predicted_Score'].max(), 100)
-        y = ((1/(sigma * np.sqrt(2 * np.pi))) * 
-             np.exp(-0.5 * ((x - mu) / sigma) ** 2))
-        ax.plot(x, y, 'r-', linewidth=2, label='Normal Distribution')
+        def draw_normal_fit(fig):
+            ax = fig.subplots()
+            
+            # Plot histogram
+            n, bins, patches = ax.hist(df['Predicted_Score'], bins=20, density=True, 
+                                      alpha=0.7, color='skyblue', edgecolor='black')
+            
+            # Plot normal distribution curve
+            mu, sigma = df['Predicted_Score'].mean(), df['Predicted_Score'].std()
+            x = np.linspace(df['Predicted_Score'].min(), df['Predicted_Score'].max(), 100)
+            y = ((1/(sigma * np.sqrt(2 * np.pi))) * 
+                 np.exp(-0.5 * ((x - mu) / sigma) ** 2))
+            ax.plot(x, y, 'r-', linewidth=2, label='Normal Distribution')
+            
+            ax.set_xlabel('Predicted Score')
+            ax.set_ylabel('Density')
+            ax.set_title('Score Distribution with Normal Curve')
+            ax.legend()
+            ax.grid(True, alpha=0.3)
         
-        ax.set_xlabel('Predicted Score')
-        ax.set_ylabel('Density')
-        ax.set_title('Score Distribution with Normal Curve')
-        ax.legend()
-        ax.grid(True, alpha=0.3)
-        st.pyplot(fig)
+        pngs = render_figures(get_dataset_version(), [('normal_fit', draw_normal_fit, (8, 6))])
+        st.image(pngs['normal_fit'])
     
     with col2:
         # Simple statistics
@@ -378,7 +438,7 @@ def show_statistical_summary(df):
         insights.append("**High Variability**: Large spread in scores suggests diverse performance levels.")
     
     # Risk insights
-    risk_percentage = (len(df[df['Predicted_Score'] < 50]) / len(df)) * 100
+    risk_percentage = (summary['at_risk'] / summary['total_students']) * 100
     if risk_percentage < 10:
         insights.append("**Low Risk Population**: Most students are predicted to perform well.")
     elif risk_percentage > 30:
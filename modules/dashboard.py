@@ -1,11 +1,10 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from utils.data_processing import get_student_insights, categorize_risk_level
+from utils.data_processing import get_student_insights
+from utils.session_data import get_scored_dataset, get_risk_summary, get_dataset_version
+from utils.charts import score_histogram_figure, cached_figure
+from utils.styles import metric_card, info_card
 
 def show():
     # Main header
@@ -17,14 +16,14 @@ def show():
     """, unsafe_allow_html=True)
     
     # Check if data exists
-    if 'df' not in st.session_state or st.session_state.df is None:
-        st.markdown("""
-        <div class="info-card warning-card">
-            <h3>No Data Available</h3>
-            <p>Please upload student data first to view the dashboard insights.</p>
-            <p>Navigate to the <strong>"Upload & Analyze"</strong> page to get started.</p>
-        </div>
-        """, unsafe_allow_html=True)
+    df = get_scored_dataset()
+    if df is None:
+        st.markdown(info_card(
+            "No Data Available",
+            "Please upload student data first to view the dashboard insights.",
+            'Navigate to the <strong>"Upload & Analyze"</strong> page to get started.',
+            variant="warning", heading="h3"
+        ), unsafe_allow_html=True)
         
         # Show sample dashboard with dummy data
         st.markdown("---")
@@ -32,10 +31,8 @@ def show():
         show_sample_dashboard()
         return
     
-    df = st.session_state.df
-    
     # Get insights
-    insights = get_student_insights(df)
+    insights = get_student_insights(df, get_risk_summary())
     
     if 'Predicted_Score' not in df.columns:
         st.warning("Predictions not available. Please re-upload your data.")
@@ -47,36 +44,16 @@ def show():
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-value">{insights['total_students']}</div>
-            <div class="metric-label">Total Students</div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(metric_card(insights['total_students'], "Total Students"), unsafe_allow_html=True)
     
     with col2:
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-value" style="color: #ef4444;">{insights['high_risk']}</div>
-            <div class="metric-label">High Risk (< 40)</div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(metric_card(insights['high_risk'], "High Risk (< 40)", "#ef4444"), unsafe_allow_html=True)
     
     with col3:
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-value" style="color: #f59e0b;">{insights['moderate_risk']}</div>
-            <div class="metric-label">Moderate Risk (40-50)</div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(metric_card(insights['moderate_risk'], "Moderate Risk (40-50)", "#f59e0b"), unsafe_allow_html=True)
     
     with col4:
-        st.markdown(f"""
-        <div class="metric-card">
-            <div class="metric-value">{insights['avg_score']}%</div>
-            <div class="metric-label">Average Score</div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(metric_card(f"{insights['avg_score']}%", "Average Score"), unsafe_allow_html=True)
     
     # Charts section
     st.markdown('<p class="section-header">Performance Analysis</p>', unsafe_allow_html=True)
@@ -84,21 +61,24 @@ def show():
     col1, col2 = st.columns(2)
     
     with col1:
-        # Score distribution
-        fig = px.histogram(
-            df, 
-            x='Predicted_Score', 
-            nbins=20,
-            title='Score Distribution',
-            color_discrete_sequence=['#2E86AB']
-        )
-        fig.add_vline(x=50, line_dash="dash", line_color="red", annotation_text="Risk Threshold")
-        fig.update_layout(
-            showlegend=False,
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            font_family="Inter"
-        )
+        # Score distribution (binned server-side, cached per dataset version)
+        def build_score_histogram():
+            fig = score_histogram_figure(
+                df['Predicted_Score'],
+                nbins=20,
+                title='Score Distribution',
+                color='#2E86AB'
+            )
+            fig.add_vline(x=50, line_dash="dash", line_color="red", annotation_text="Risk Threshold")
+            fig.update_layout(
+                showlegend=False,
+                plot_bgcolor='white',
+                paper_bgcolor='white',
+                font_family="Inter"
+            )
+            return fig
+        
+        fig = cached_figure(get_dataset_version(), 'dashboard_score_histogram', build_score_histogram)
         st.plotly_chart(fig, use_container_width=True)
     
     with col2:
@@ -182,32 +162,29 @@ def show():
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.markdown(f"""
-        <div class="info-card success-card">
-            <h4>Students Performing Well</h4>
-            <p><strong>{insights['excellent'] + insights['low_risk']}</strong> students are predicted to score 50% or above</p>
-            <p>That's <strong>{round((insights['excellent'] + insights['low_risk']) / insights['total_students'] * 100, 1)}%</strong> of all students!</p>
-        </div>
-        """, unsafe_allow_html=True)
+        performing_well = insights['excellent'] + insights['low_risk']
+        st.markdown(info_card(
+            "Students Performing Well",
+            f"<strong>{performing_well}</strong> students are predicted to score 50% or above",
+            f"That's <strong>{round(performing_well / insights['total_students'] * 100, 1)}%</strong> of all students!",
+            variant="success"
+        ), unsafe_allow_html=True)
     
     with col2:
-        st.markdown(f"""
-        <div class="info-card warning-card">
-            <h4>Students Needing Support</h4>
-            <p><strong>{insights['high_risk'] + insights['moderate_risk']}</strong> students may need additional support</p>
-            <p>Focus on <strong>{insights['high_risk']}</strong> high-risk students first</p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(info_card(
+            "Students Needing Support",
+            f"<strong>{insights['high_risk'] + insights['moderate_risk']}</strong> students may need additional support",
+            f"Focus on <strong>{insights['high_risk']}</strong> high-risk students first",
+            variant="warning"
+        ), unsafe_allow_html=True)
     
     with col3:
         performance_trend = "Positive" if insights['avg_score'] >= 60 else "Needs Improvement"
-        st.markdown(f"""
-        <div class="info-card">
-            <h4>Overall Performance</h4>
-            <p>Class average: <strong>{insights['avg_score']}%</strong></p>
-            <p>Trend: <strong>{performance_trend}</strong></p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(info_card(
+            "Overall Performance",
+            f"Class average: <strong>{insights['avg_score']}%</strong>",
+            f"Trend: <strong>{performance_trend}</strong>"
+        ), unsafe_allow_html=True)
 
 def show_sample_dashboard():
     """Show a sample dashboard with dummy data"""
@@ -217,33 +194,13 @@ def show_sample_dashboard():
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.markdown("""
-        <div class="metric-card">
-            <div class="metric-value">150</div>
-            <div class="metric-label">Total Students</div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(metric_card("150", "Total Students"), unsafe_allow_html=True)
     
     with col2:
-        st.markdown("""
-        <div class="metric-card">
-            <div class="metric-value" style="color: #ef4444;">12</div>
-            <div class="metric-label">High Risk</div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(metric_card("12", "High Risk", "#ef4444"), unsafe_allow_html=True)
     
     with col3:
-        st.markdown("""
-        <div class="metric-card">
-            <div class="metric-value" style="color: #f59e0b;">18</div>
-            <div class="metric-label">Moderate Risk</div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(metric_card("18", "Moderate Risk", "#f59e0b"), unsafe_allow_html=True)
     
     with col4:
-        st.markdown("""
-        <div class="metric-card">
-            <div class="metric-value">67.3%</div>
-            <div class="metric-label">Average Score</div>
-        </div>
-        """, unsafe_allow_html=True)
\ No newline at end of file
+        st.markdown(metric_card("67.3%", "Average Score"), unsafe_allow_html=True)
\ No newline at end of file
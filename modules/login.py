@@ -1,25 +1,12 @@
 import streamlit as st
 import hashlib
-import json
-from pathlib import Path
+from utils.user_store import get_user_store
+from utils.session_data import begin_login_session, end_login_session
 
 def hash_password(password):
     """Hash password using SHA-256"""
     return hashlib.sha256(str.encode(password)).hexdigest()
 
-def load_users():
-    """Load users from JSON file"""
-    users_file = Path("users.json")
-    if users_file.exists():
-        with open(users_file, "r") as f:
-            return json.load(f)
-    return {}
-
-def save_users(users):
-    """Save users to JSON file"""
-    with open("users.json", "w") as f:
-        json.dump(users, f, indent=2)
-
 def show():
     st.markdown("""
     <div class="auth-header" style="text-align: center; margin-bottom: 2rem;">
@@ -40,6 +27,7 @@ def show():
         
         st.markdown("---")
         if st.button("Logout", type="secondary", use_container_width=True):
+            end_login_session()
             st.session_state.logged_in = False
             st.session_state.username = None
             st.success("Logged out successfully!")
@@ -61,13 +49,14 @@ def show():
         
         if login_button:
             if username and password:
-                users = load_users()
+                user = get_user_store().get_user(username)
                 hashed_password = hash_password(password)
                 
-                if username in users and users[username]['password'] == hashed_password:
+                if user is not None and user['password'] == hashed_password:
                     st.session_state.logged_in = True
                     st.session_state.username = username
-                    st.session_state.user_data = users[username]
+                    st.session_state.user_data = user
+                    begin_login_session(username)
                     st.success("Login successful!")
                     st.balloons()
                     st.rerun()
@@ -1,26 +1,13 @@
 import streamlit as st
 import hashlib
-import json
-from pathlib import Path
 import re
+from utils.user_store import get_user_store
+from utils.session_data import begin_login_session
 
 def hash_password(password):
     """Hash password using SHA-256"""
     return hashlib.sha256(str.encode(password)).hexdigest()
 
-def load_users():
-    """Load users from JSON file"""
-    users_file = Path("users.json")
-    if users_file.exists():
-        with open(users_file, "r") as f:
-            return json.load(f)
-    return {}
-
-def save_users(users):
-    """Save users to JSON file"""
-    with open("users.json", "w") as f:
-        json.dump(users, f, indent=2)
-
 def validate_email(email):
     """Validate email format"""
     pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
@@ -89,16 +76,16 @@ def show():
                 if not is_valid:
                     st.error(message)
                 else:
-                    users = load_users()
+                    store = get_user_store()
                     
                     # Check if username or email already exists
-                    if username in users:
+                    if store.get_user(username) is not None:
                         st.error("Username already exists")
-                    elif any(user.get('email') == email for user in users.values()):
+                    elif store.email_exists(email):
                         st.error("Email already registered")
                     else:
                         # Create new user
-                        users[username] = {
+                        user = {
                             'password': hash_password(password),
                             'email': email,
                             'first_name': first_name,
@@ -107,16 +94,21 @@ def show():
                             'created_at': str(st.session_state.get('current_time', 'now'))
                         }
                         
-                        save_users(users)
-                        st.success("Account created successfully! Please sign in.")
-                        st.balloons()
-                        
-                        # Auto-login
-                        st.session_state.logged_in = True
-                        st.session_state.username = username
-                        st.session_state.user_data = users[username]
-                        st.session_state.page = 'Dashboard'
-                        st.rerun()
+                        created, message = store.create_user(username, user)
+                        if not created:
+                            # Lost a race with a concurrent signup
+                            st.error(message)
+                        else:
+                            st.success("Account created successfully! Please sign in.")
+                            st.balloons()
+                            
+                            # Auto-login
+                            st.session_state.logged_in = True
+                            st.session_state.username = username
+                            st.session_state.user_data = user
+                            begin_login_session(username)
+                            st.session_state.page = 'Dashboard'
+                            st.rerun()
     
     # Password requirements
     st.markdown("""
@@ -1,13 +1,70 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
 from utils.data_processing import (
-    preprocess_data, load_model, make_predictions, 
-    highlight_risk_score, create_sample_data, categorize_risk_level
+    load_model, get_model_version, score_dataframe, compact_scored_dataset, read_student_file,
+    create_sample_data, UPLOAD_FORMATS
 )
+from utils.prediction_cache import prediction_cache, make_cache_key, dataframe_nbytes
+from utils.session_data import set_scored_dataset, get_risk_summary
+from utils.jobs import job_manager, BACKGROUND_JOB_MIN_BYTES, STAGES, STAGE_LABELS
+from utils.charts import score_histogram_figure, cached_figure
+from utils.styles import metric_card, info_card
+from utils.results_table import SORT_OPTIONS, show_results_table, view_index
+from utils.exports import show_export_button
+
+HIGH_RISK_ACTIONS = (
+    "Schedule one-on-one meetings",
+    "Provide additional tutoring",
+    "Contact parents/guardians",
+    "Consider modified learning plans",
+)
+MODERATE_RISK_ACTIONS = (
+    "Increase study group participation",
+    "Provide practice materials",
+    "Regular progress check-ins",
+    "Peer mentoring programs",
+)
+
+def show_scoring_job(cache_key, raw_bytes, filename, model):
+    """
+    Score a large upload as a background job and report its progress.
+
+    Returns the scored cache entry once the job is done, otherwise None.
+    """
+    job = st.session_state.get('scoring_job')
+    if job is None or job.key != cache_key:
+        job = job_manager.submit(cache_key, raw_bytes, filename, model)
+        st.session_state.scoring_job = job
+    
+    if job.status in ('queued', 'running'):
+        @st.fragment(run_every=1)
+        def job_progress():
+            if job.status not in ('queued', 'running'):
+                st.rerun()
+            label = STAGE_LABELS.get(job.stage, "Waiting for a free worker")
+            st.progress(job.progress, text=f"{label}... {job.progress:.0%}")
+            if st.button("Cancel", key="cancel_scoring_job"):
+                job.cancel()
+        
+        st.info(f"Large file ({len(raw_bytes) / 2**20:.0f} MB): scoring in the background. "
+                "You can keep using the other pages; results appear when it finishes.")
+        job_progress()
+        return None
+    
+    if job.status in ('cancelled', 'failed'):
+        completed = [STAGE_LABELS[stage] for stage in STAGES if stage in job.outputs]
+        if job.status == 'cancelled':
+            st.warning("Scoring was cancelled.")
+        else:
+            st.error(f"Error during prediction: {job.error}")
+        if completed:
+            st.caption(f"Completed stages are kept: {', '.join(completed)}")
+        if st.button("Resubmit", key="resubmit_scoring_job", use_container_width=True):
+            job_manager.resubmit(job)
+            st.rerun()
+        return None
+    
+    return job.result
 
 def show():
     # Main header
@@ -21,24 +78,28 @@ def show():
     # Instructions section
     with st.expander("Data Upload Instructions", expanded=False):
         st.markdown("""
-        ### Required CSV Format
-        Your CSV file should contain the following columns:
+        ### Required Data Format
+        Upload a CSV, Parquet or Arrow (Feather/IPC) file with the following columns:
         
         **Required Columns:**
         - `Student_ID`: Unique identifier for each student
-        - `Age`: Student age
         - `Gender`: Male/Female
         - `Study_Hours_per_Week`: Hours spent studying per week
         - `Attendance_Rate`: Attendance percentage (0-100)
-        - `Previous_Grade`: Previous academic grade (A/B/C/D)
-        - `Parental_Education_Level`: Parent education level
+        - `Past_Exam_Scores`: Score on previous exams (0-100)
+        - `Parental_Education_Level`: High School/Bachelors/Masters/PhD
         - `Internet_Access_at_Home`: Yes/No
         - `Extracurricular_Activities`: Yes/No
         
         **Optional Columns:**
+        - `Age`: Student age
+        - `Previous_Grade`: Previous academic grade (A/B/C/D)
         - `Family_Income_Level`: Low/Medium/High
         - Any other demographic or academic data
         
+        Parquet and Arrow files are read column by column: only `Student_ID` and
+        the required columns are loaded, so large exports upload much faster.
+        
         **Tip:** Make sure your data is clean and contains no missing values for best results.
         """)
     
@@ -49,16 +110,23 @@ def show():
     
     with col1:
         uploaded_file = st.file_uploader(
-            "Choose a CSV file",
-            type=["csv"],
-            help="Upload a CSV file containing student data"
+            "Choose a data file",
+            type=[ext.lstrip(".") for ext in UPLOAD_FORMATS],
+            help="Upload a CSV, Parquet or Arrow file containing student data"
         )
         
         # Sample data option
         if st.button("Use Sample Data for Demo", use_container_width=True):
             sample_df = create_sample_data()
             st.session_state.uploaded_df = sample_df
+            st.session_state.use_sample = True
             st.success("Sample data loaded! Scroll down to see the analysis.")
+        
+        # Kept in session state so reruns from the table and export controls
+        # still show the sample results; a real upload takes over
+        if uploaded_file is not None:
+            st.session_state.pop('use_sample', None)
+        elif st.session_state.get('use_sample', False):
             uploaded_file = "sample"  # Trigger processing
     
     with col2:
@@ -78,13 +146,44 @@ def show():
     # Process uploaded file
     if uploaded_file:
         try:
-            # Load data
+            # Load model
+            model = load_model()
+            if model is None:
+                st.error("Could not load the prediction model. Please ensure 'model.pkl' is available.")
+                return
+            
+            # Scored results are cached on the upload's content and the model version
             if uploaded_file == "sample":
-                df = st.session_state.uploaded_df
+                sample_df = st.session_state.uploaded_df
+                raw_bytes = pd.util.hash_pandas_object(sample_df).values.tobytes()
                 st.info("Using sample data for demonstration")
             else:
-                with st.spinner("Reading your data..."):
-                    df = pd.read_csv(uploaded_file)
+                raw_bytes = uploaded_file.getvalue()
+            cache_key = make_cache_key(raw_bytes, get_model_version())
+            cached = prediction_cache.get(cache_key)
+            
+            # Large uploads are scored off the script thread by a background job
+            if cached is None and uploaded_file != "sample" and len(raw_bytes) >= BACKGROUND_JOB_MIN_BYTES:
+                cached = show_scoring_job(cache_key, raw_bytes, uploaded_file.name, model)
+                if cached is None:
+                    return
+            else:
+                # An earlier background job no longer belongs to the data on screen
+                st.session_state.pop('scoring_job', None)
+            
+            if cached is None:
+                # Load data
+                if uploaded_file == "sample":
+                    df = sample_df.copy()
+                else:
+                    with st.spinner("Reading your data..."):
+                        df = read_student_file(raw_bytes, uploaded_file.name)
+                raw_columns = list(df.columns)
+                missing_values = int(df.isnull().sum().sum())
+            else:
+                df = cached['df']
+                raw_columns = cached['raw_columns']
+                missing_values = cached['missing_values']
             
             # Display data info
             st.markdown('<p class="section-header">Data Overview</p>', unsafe_allow_html=True)
@@ -93,124 +192,98 @@ def show():
             with col1:
                 st.metric("Total Records", len(df))
             with col2:
-                st.metric("Total Columns", len(df.columns))
+                st.metric("Total Columns", len(raw_columns))
             with col3:
-                missing_values = df.isnull().sum().sum()
                 st.metric("Missing Values", missing_values)
             
             # Show data preview
             with st.expander("Preview Data", expanded=False):
-                st.dataframe(df.head(), use_container_width=True)
+                preview_columns = [col for col in raw_columns if col in df.columns]
+                st.dataframe(df[preview_columns].head(), use_container_width=True)
             
             # Data preprocessing and prediction
-            with st.spinner("Analyzing data and making predictions..."):
-                try:
-                    # Preprocess data
-                    df_processed = preprocess_data(df.copy())
-                    
-                    # Load model
-                    model = load_model()
-                    if model is None:
-                        st.error("Could not load the prediction model. Please ensure 'model.pkl' is available.")
+            if cached is None:
+                with st.spinner("Analyzing data and making predictions..."):
+                    try:
+                        # Preprocess data, make predictions and add them to the dataframe
+                        score_dataframe(df, model)
+                        # Sessions and the cache hold the compacted copy only
+                        df = compact_scored_dataset(df)
+                        
+                        prediction_cache.put(cache_key, {
+                            'df': df,
+                            'raw_columns': raw_columns,
+                            'missing_values': missing_values,
+                        }, dataframe_nbytes(df))
+                        
+                    except Exception as e:
+                        st.error(f"Error during prediction: {str(e)}")
+                        st.info("Please check that your data format matches the requirements.")
                         return
-                    
-                    # Make predictions
-                    predictions = make_predictions(df_processed, model)
-                    
-                    # Add predictions to original dataframe
-                    df['Predicted_Score'] = predictions
-                    df['Risk_Level'] = df['Predicted_Score'].apply(lambda x: categorize_risk_level(x)[0])
-                    df['Risk_Icon'] = df['Predicted_Score'].apply(lambda x: categorize_risk_level(x)[1])
-                    
-                    # Store in session state
-                    st.session_state.df = df
-                    
-                    st.success("Analysis complete! Here are your results:")
-                    
-                except Exception as e:
-                    st.error(f"Error during prediction: {str(e)}")
-                    st.info("Please check that your data format matches the requirements.")
-                    return
+            
+            # Store in session state (builds the shared risk summary once per dataset)
+            set_scored_dataset(df, cache_key, cached.get('risk_summary') if cached is not None else None)
+            
+            st.success("Analysis complete! Here are your results:")
             
             # Results section
             st.markdown('<p class="section-header">Prediction Results</p>', unsafe_allow_html=True)
             
             # Key metrics
-            total_students = len(df)
-            high_risk = len(df[df['Predicted_Score'] < 40])
-            moderate_risk = len(df[(df['Predicted_Score'] >= 40) & (df['Predicted_Score'] < 50)])
-            low_risk = len(df[(df['Predicted_Score'] >= 50) & (df['Predicted_Score'] < 70)])
-            excellent = len(df[df['Predicted_Score'] >= 70])
-            avg_score = round(df['Predicted_Score'].mean(), 2)
+            summary = get_risk_summary()
+            total_students = summary['total_students']
+            high_risk = summary['high_risk']
+            moderate_risk = summary['moderate_risk']
+            low_risk = summary['low_risk']
+            excellent = summary['excellent']
+            avg_score = summary['avg_score']
             
             # Metrics display
             col1, col2, col3, col4, col5 = st.columns(5)
             
             with col1:
-                st.markdown(f"""
-                <div class="metric-card">
-                    <div class="metric-value">{total_students}</div>
-                    <div class="metric-label">Total Students</div>
-                </div>
-                """, unsafe_allow_html=True)
+                st.markdown(metric_card(total_students, "Total Students"), unsafe_allow_html=True)
             
             with col2:
-                st.markdown(f"""
-                <div class="metric-card">
-                    <div class="metric-value" style="color: #ef4444;">{high_risk}</div>
-                    <div class="metric-label">High Risk (< 40)</div>
-                </div>
-                """, unsafe_allow_html=True)
+                st.markdown(metric_card(high_risk, "High Risk (< 40)", "#ef4444"), unsafe_allow_html=True)
             
             with col3:
-                st.markdown(f"""
-                <div class="metric-card">
-                    <div class="metric-value" style="color: #f59e0b;">{moderate_risk}</div>
-                    <div class="metric-label">Moderate Risk (40-50)</div>
-                </div>
-                """, unsafe_allow_html=True)
+                st.markdown(metric_card(moderate_risk, "Moderate Risk (40-50)", "#f59e0b"), unsafe_allow_html=True)
             
             with col4:
-                st.markdown(f"""
-                <div class="metric-card">
-                    <div class="metric-value" style="color: #10b981;">{low_risk + excellent}</div>
-                    <div class="metric-label">Good Performance (50+)</div>
-                </div>
-                """, unsafe_allow_html=True)
+                st.markdown(metric_card(low_risk + excellent, "Good Performance (50+)", "#10b981"), unsafe_allow_html=True)
             
             with col5:
-                st.markdown(f"""
-                <div class="metric-card">
-                    <div class="metric-value">{avg_score}%</div>
-                    <div class="metric-label">Average Score</div>
-                </div>
-                """, unsafe_allow_html=True)
+                st.markdown(metric_card(f"{avg_score}%", "Average Score"), unsafe_allow_html=True)
             
             # Visualizations
             st.markdown('<p class="section-header">Score Distribution</p>', unsafe_allow_html=True)
             
-            # Score distribution chart
-            fig = px.histogram(
-                df, 
-                x='Predicted_Score', 
-                nbins=25,
-                title='Distribution of Predicted Exam Scores',
-                color_discrete_sequence=['#2E86AB'],
-                labels={'Predicted_Score': 'Predicted Score', 'count': 'Number of Students'}
-            )
-            
-            # Add threshold lines
-            fig.add_vline(x=40, line_dash="dash", line_color="red", annotation_text="High Risk Threshold")
-            fig.add_vline(x=50, line_dash="dash", line_color="orange", annotation_text="Moderate Risk Threshold")
-            fig.add_vline(x=70, line_dash="dash", line_color="green", annotation_text="Excellence Threshold")
-            
-            fig.update_layout(
-                plot_bgcolor='white',
-                paper_bgcolor='white',
-                font_family="Inter",
-                showlegend=False
-            )
+            # Score distribution chart (binned server-side, cached per dataset version)
+            def build_score_histogram():
+                fig = score_histogram_figure(
+                    df['Predicted_Score'],
+                    nbins=25,
+                    title='Distribution of Predicted Exam Scores',
+                    color='#2E86AB',
+                    x_label='Predicted Score',
+                    y_label='Number of Students'
+                )
+                
+                # Add threshold lines
+                fig.add_vline(x=40, line_dash="dash", line_color="red", annotation_text="High Risk Threshold")
+                fig.add_vline(x=50, line_dash="dash", line_color="orange", annotation_text="Moderate Risk Threshold")
+                fig.add_vline(x=70, line_dash="dash", line_color="green", annotation_text="Excellence Threshold")
+                
+                fig.update_layout(
+                    plot_bgcolor='white',
+                    paper_bgcolor='white',
+                    font_family="Inter",
+                    showlegend=False
+                )
+                return fig
             
+            fig = cached_figure(cache_key, 'upload_score_histogram', build_score_histogram)
             st.plotly_chart(fig, use_container_width=True)
             
             # Results tables
@@ -221,60 +294,27 @@ def show():
             
             with tab1:
                 st.markdown("#### All Student Predictions")
-                display_df = df[['Student_ID', 'Predicted_Score', 'Risk_Level', 'Risk_Icon']].copy()
-                display_df.columns = ['Student ID', 'Predicted Score', 'Risk Level', '']
-                
-                # Apply styling
-                styled_df = display_df.style.applymap(
-                    highlight_risk_score, 
-                    subset=['Predicted Score']
-                ).format({'Predicted Score': '{:.1f}%'})
+                sort_by = st.selectbox("Sort by", list(SORT_OPTIONS), key="results_sort")
+                show_results_table(df, cache_key, 'all', SORT_OPTIONS[sort_by], show_icon=True)
                 
-                st.dataframe(styled_df, use_container_width=True, hide_index=True)
+                # Parquet keeps the dtypes (categorical risk levels) intact
+                show_export_button(df, cache_key, 'scored', default_format='parquet')
             
             with tab2:
-                at_risk_students = df[df['Predicted_Score'] < 50].copy()
-                if len(at_risk_students) > 0:
-                    st.markdown(f"#### {len(at_risk_students)} Students Need Additional Support")
-                    
-                    display_df = at_risk_students[['Student_ID', 'Predicted_Score', 'Risk_Level']].copy()
-                    display_df.columns = ['Student ID', 'Predicted Score', 'Risk Level']
-                    display_df = display_df.sort_values('Predicted Score')
-                    
-                    styled_df = display_df.style.applymap(
-                        highlight_risk_score, 
-                        subset=['Predicted Score']
-                    ).format({'Predicted Score': '{:.1f}%'})
-                    
-                    st.dataframe(styled_df, use_container_width=True, hide_index=True)
-                    
-                    # Download button for at-risk students
-                    csv = at_risk_students.to_csv(index=False).encode('utf-8')
-                    st.download_button(
-                        label="Download At-Risk Students Report",
-                        data=csv,
-                        file_name="at_risk_students.csv",
-                        mime="text/csv",
-                        use_container_width=True
-                    )
+                n_at_risk = len(view_index(df, cache_key, 'at_risk'))
+                if n_at_risk > 0:
+                    st.markdown(f"#### {n_at_risk} Students Need Additional Support")
+                    show_results_table(df, cache_key, 'at_risk')
+                    show_export_button(df, cache_key, 'at_risk')
                 else:
                     st.success("Great news! No students are predicted to be at risk.")
             
             with tab3:
-                top_performers = df[df['Predicted_Score'] >= 70].copy()
-                if len(top_performers) > 0:
-                    st.markdown(f"#### {len(top_performers)} Top Performing Students")
-                    
-                    display_df = top_performers[['Student_ID', 'Predicted_Score', 'Risk_Level']].copy()
-                    display_df.columns = ['Student ID', 'Predicted Score', 'Risk Level']
-                    display_df = display_df.sort_values('Predicted Score', ascending=False)
-                    
-                    styled_df = display_df.style.applymap(
-                        highlight_risk_score, 
-                        subset=['Predicted Score']
-                    ).format({'Predicted Score': '{:.1f}%'})
-                    
-                    st.dataframe(styled_df, use_container_width=True, hide_index=True)
+                n_top = len(view_index(df, cache_key, 'top'))
+                if n_top > 0:
+                    st.markdown(f"#### {n_top} Top Performing Students")
+                    show_results_table(df, cache_key, 'top')
+                    show_export_button(df, cache_key, 'top')
                 else:
                     st.info("No students are predicted to achieve excellence level (70%+) yet.")
             
@@ -285,47 +325,31 @@ def show():
             
             with col1:
                 if high_risk > 0:
-                    st.markdown(f"""
-                    <div class="info-card danger-card">
-                        <h4>Immediate Action Required</h4>
-                        <p><strong>{high_risk}</strong> students are at high risk of failing.</p>
-                        <ul style="text-align: left; margin-left: 1rem;">
-                            <li>Schedule one-on-one meetings</li>
-                            <li>Provide additional tutoring</li>
-                            <li>Contact parents/guardians</li>
-                            <li>Consider modified learning plans</li>
-                        </ul>
-                    </div>
-                    """, unsafe_allow_html=True)
+                    st.markdown(info_card(
+                        "Immediate Action Required",
+                        f"<strong>{high_risk}</strong> students are at high risk of failing.",
+                        variant="danger", items=HIGH_RISK_ACTIONS
+                    ), unsafe_allow_html=True)
                 else:
-                    st.markdown("""
-                    <div class="info-card success-card">
-                        <h4>No High-Risk Students</h4>
-                        <p>Excellent! Your current teaching strategies are working well.</p>
-                    </div>
-                    """, unsafe_allow_html=True)
+                    st.markdown(info_card(
+                        "No High-Risk Students",
+                        "Excellent! Your current teaching strategies are working well.",
+                        variant="success"
+                    ), unsafe_allow_html=True)
             
             with col2:
                 if moderate_risk > 0:
-                    st.markdown(f"""
-                    <div class="info-card warning-card">
-                        <h4>Monitor Closely</h4>
-                        <p><strong>{moderate_risk}</strong> students need extra support.</p>
-                        <ul style="text-align: left; margin-left: 1rem;">
-                            <li>Increase study group participation</li>
-                            <li>Provide practice materials</li>
-                            <li>Regular progress check-ins</li>
-                            <li>Peer mentoring programs</li>
-                        </ul>
-                    </div>
-                    """, unsafe_allow_html=True)
+                    st.markdown(info_card(
+                        "Monitor Closely",
+                        f"<strong>{moderate_risk}</strong> students need extra support.",
+                        variant="warning", items=MODERATE_RISK_ACTIONS
+                    ), unsafe_allow_html=True)
                 else:
-                    st.markdown("""
-                    <div class="info-card success-card">
-                        <h4>Strong Performance</h4>
-                        <p>Most students are on track for success!</p>
-                    </div>
-                    """, unsafe_allow_html=True)
+                    st.markdown(info_card(
+                        "Strong Performance",
+                        "Most students are on track for success!",
+                        variant="success"
+                    ), unsafe_allow_html=True)
         
         except Exception as e:
             st.error(f"Error processing file: {str(e)}")
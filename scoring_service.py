@@ -0,0 +1,330 @@
+"""
+Local HTTP scoring service for EduPredict.
+
+Loads model.pkl and preprocessor.pkl once and serves predictions over HTTP.
+Requests that arrive within a short batching window are coalesced into a
+single vectorized make_predictions call:
+
+    python scoring_service.py --port 8502 --batch-window-ms 5
+
+Endpoints:
+    POST /predict   one student (JSON object), a batch (JSON list or
+                    {"students": [...]}) or a CSV body (Content-Type: text/csv)
+    GET  /metrics   request latency and batch size histograms
+    GET  /health    model version and uptime
+"""
+import argparse
+import bisect
+import json
+import queue
+import sys
+import threading
+import time
+import warnings
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from utils.data_processing import (
+    NON_FEATURE_COLS, bucket_risk_levels, get_model_version, load_model, load_preprocessor,
+    make_predictions, preprocess_data, read_student_csv
+)
+
+DEFAULT_BATCH_WINDOW_MS = 5
+DEFAULT_MAX_BATCH_ROWS = 4096
+MAX_BODY_BYTES = 32 * 2**20
+
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096]
+
+
+class Histogram:
+    """
+    Thread-safe fixed-bucket histogram; each bucket counts values <= its bound
+    """
+
+    def __init__(self, bounds):
+        self.bounds = list(bounds)
+        self._counts = [0] * (len(self.bounds) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self._counts[bisect.bisect_left(self.bounds, value)] += 1
+            self._sum += value
+
+    def snapshot(self):
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        n = sum(counts)
+        labels = [f"<={bound}" for bound in self.bounds] + [f">{self.bounds[-1]}"]
+        return {
+            'count': n,
+            'mean': total / n if n else None,
+            'buckets': dict(zip(labels, counts)),
+        }
+
+
+class ServiceMetrics:
+    """Counters and histograms reported by GET /metrics"""
+
+    def __init__(self):
+        self.request_latency_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.batch_rows = Histogram(BATCH_SIZE_BUCKETS)
+        self.batch_requests = Histogram(BATCH_SIZE_BUCKETS)
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self):
+        return {
+            'request_latency_ms': self.request_latency_ms.snapshot(),
+            'batch_rows': self.batch_rows.snapshot(),
+            'batch_requests': self.batch_requests.snapshot(),
+            'errors': self.errors,
+        }
+
+
+class MicroBatcher:
+    """
+    Coalesces preprocessed feature frames from concurrent requests into one
+    make_predictions call.
+
+    The first request of a batch opens a window of ``window`` seconds; every
+    request queued before it closes (or until ``max_rows`` is reached) is
+    scored together, and each caller's future gets back its own slice.
+    """
+
+    def __init__(self, model, window, max_rows, metrics):
+        self.model = model
+        self.window = window
+        self.max_rows = max_rows
+        self.metrics = metrics
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, features):
+        """
+        Queue a preprocessed feature frame; returns a Future of its scores
+        """
+        future = Future()
+        self._queue.put((features, future))
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            rows = len(batch[0][0])
+            deadline = time.monotonic() + self.window
+            while rows < self.max_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                rows += len(item[0])
+            self._score(batch, rows)
+
+    def _score(self, batch, rows):
+        try:
+            frames = [features for features, _ in batch]
+            X = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+            scores = make_predictions(X, self.model)
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            # Score each request on its own so one bad request can't fail the others
+            for item in batch:
+                self._score([item], len(item[0]))
+            return
+
+        self.metrics.batch_rows.observe(rows)
+        self.metrics.batch_requests.observe(len(batch))
+        offset = 0
+        for features, future in batch:
+            future.set_result(scores[offset:offset + len(features)])
+            offset += len(features)
+
+
+def numeric_features(features):
+    """
+    Cast the model features of a preprocessed frame to float, raising
+    ValueError for values the model can't score (text or missing values)
+    """
+    numeric = {}
+    for col in features.columns:
+        if col in NON_FEATURE_COLS:
+            continue
+        values = pd.to_numeric(features[col], errors="coerce").astype("float64")
+        invalid = values.isna()
+        if invalid.any():
+            bad = features[col][invalid].unique()[:5]
+            raise ValueError(f"Invalid values in '{col}': {', '.join(map(str, bad))}")
+        numeric[col] = values
+    return pd.DataFrame(numeric, index=features.index)
+
+
+def parse_payload(body, content_type, preprocessor=None):
+    """
+    Turn a request body into a DataFrame of students
+    """
+    if content_type.startswith("text/csv"):
+        return read_student_csv(body, preprocessor)
+
+    payload = json.loads(body)
+    if isinstance(payload, dict) and "students" in payload:
+        payload = payload["students"]
+    if isinstance(payload, dict):
+        payload = [payload]
+    if not isinstance(payload, list) or not all(isinstance(row, dict) for row in payload):
+        raise ValueError("Expected a student object, a list of students or {\"students\": [...]}")
+    return pd.DataFrame(payload)
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    # Set on the handler class by make_server()
+    service = None
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            self._send_json(200, self.service.metrics.snapshot())
+        elif self.path == "/health":
+            self._send_json(200, {
+                'status': 'ok',
+                'model_version': self.service.model_version,
+                'uptime_seconds': round(time.monotonic() - self.service.started, 1),
+            })
+        else:
+            self._send_json(404, {'error': f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/predict":
+            self._send_json(404, {'error': f"Unknown path {self.path}"})
+            return
+
+        start = time.perf_counter()
+        length = int(self.headers.get("Content-Length", 0))
+        if length > MAX_BODY_BYTES:
+            self.service.metrics.record_error()
+            self._send_json(413, {'error': f"Request body larger than {MAX_BODY_BYTES} bytes"})
+            return
+
+        try:
+            df = parse_payload(self.rfile.read(length), self.headers.get("Content-Type", "application/json"),
+                               self.service.preprocessor)
+            if df.empty:
+                raise ValueError("No students in request")
+            # Encoding and value errors belong to this request alone, so
+            # preprocess and validate before batching
+            features = numeric_features(preprocess_data(df, self.service.preprocessor))
+        except (ValueError, TypeError) as e:
+            # TypeError: nested JSON values (lists, objects) where a scalar is expected
+            self.service.metrics.record_error()
+            self._send_json(400, {'error': str(e)})
+            return
+
+        try:
+            scores = self.service.batcher.submit(features).result()
+        except Exception as e:
+            self.service.metrics.record_error()
+            self._send_json(500, {'error': str(e)})
+            return
+
+        buckets = bucket_risk_levels(scores)
+        predictions = pd.DataFrame({
+            'Predicted_Score': np.round(scores, 2),
+            'Risk_Level': buckets['levels'].astype(str),
+        })
+        if 'Student_ID' in df.columns:
+            predictions.insert(0, 'Student_ID', df['Student_ID'].to_numpy())
+
+        self._send_json(200, {
+            'model_version': self.service.model_version,
+            'predictions': predictions.to_dict(orient="records"),
+        })
+        self.service.metrics.request_latency_ms.observe((time.perf_counter() - start) * 1000)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, default=lambda value: value.item()).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Per-request access logs would dominate the cost of a single-student call
+        pass
+
+
+class ScoringServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Integrations fire many small requests at once; the default backlog of 5 resets them
+    request_queue_size = 256
+
+
+class ScoringService:
+    """
+    The model, its preprocessor, the batcher and the metrics shared by all requests
+    """
+
+    def __init__(self, window=DEFAULT_BATCH_WINDOW_MS / 1000, max_rows=DEFAULT_MAX_BATCH_ROWS):
+        self.model = load_model()
+        if self.model is None:
+            raise FileNotFoundError("model.pkl not found")
+        self.preprocessor = load_preprocessor()
+        if self.preprocessor is None:
+            # Without it every request would be label-encoded on its own, so a
+            # single student's categories would always encode to 0
+            raise FileNotFoundError("preprocessor.pkl not found; run 'python main.py train' first")
+        self.model_version = get_model_version()
+        self.metrics = ServiceMetrics()
+        self.batcher = MicroBatcher(self.model, window, max_rows, self.metrics)
+        self.started = time.monotonic()
+
+
+def make_server(host, port, service):
+    """
+    Build a threaded HTTP server bound to ``service``
+    """
+    handler = type("BoundScoringHandler", (ScoringHandler,), {'service': service})
+    return ScoringServer((host, port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve EduPredict predictions over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--batch-window-ms", type=float, default=DEFAULT_BATCH_WINDOW_MS,
+                        help="How long the first request of a batch waits for others")
+    parser.add_argument("--max-batch-rows", type=int, default=DEFAULT_MAX_BATCH_ROWS,
+                        help="Score a batch as soon as it holds this many students")
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings("ignore", module="sklearn")
+    service = ScoringService(args.batch_window_ms / 1000, args.max_batch_rows)
+    server = make_server(args.host, args.port, service)
+    print(f"Scoring service listening on http://{args.host}:{args.port} (model {service.model_version})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
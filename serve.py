@@ -0,0 +1,43 @@
+"""
+Start EduPredict with a server-start warm-up and a readiness endpoint.
+
+Warms up the page modules, model, first prediction, matplotlib, Plotly and
+CSS in the background as soon as the process starts, then runs the
+Streamlit app in the same process. A load balancer can poll the readiness
+endpoint and only route traffic once it returns 200:
+
+    python serve.py --readiness-port 8503 -- --server.port 8501
+    curl localhost:8503/ready     # 503 while warming up, 200 when ready
+    curl localhost:8503/warmup    # per-step timings
+"""
+import argparse
+import os
+import sys
+
+from streamlit.web import cli as stcli
+
+from utils.warm_up import start_readiness_server, warm_up
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run EduPredict with warm-up and readiness checks")
+    parser.add_argument("--readiness-host", default="0.0.0.0")
+    parser.add_argument("--readiness-port", type=int, default=8503,
+                        help="Port for GET /ready and GET /warmup")
+    parser.add_argument("streamlit_args", nargs=argparse.REMAINDER,
+                        help="Arguments passed on to 'streamlit run' (after --)")
+    args = parser.parse_args(argv)
+    streamlit_args = [arg for arg in args.streamlit_args if arg != "--"]
+
+    # Runs regardless of EDUPREDICT_WARM_UP: readiness depends on it
+    warm_up.start()
+    start_readiness_server(args.readiness_host, args.readiness_port)
+
+    sys.argv = ["streamlit", "run", APP_PATH, *streamlit_args]
+    return stcli.main()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+import numpy as np
+import plotly.graph_objects as go
+
+from utils.lru_cache import LRUCache
+
+# Budget for cached Plotly figures; binned figures are a few KB each
+FIGURE_CACHE_BYTES = 16 * 1024 * 1024
+
+_figure_cache = LRUCache(FIGURE_CACHE_BYTES)
+
+
+def score_histogram(scores, nbins):
+    """
+    Bin scores server-side; returns (counts, bin_edges) like np.histogram
+    """
+    scores = np.asarray(scores, dtype=float)
+    scores = scores[~np.isnan(scores)]
+    return np.histogram(scores, bins=nbins)
+
+
+def score_histogram_figure(scores, nbins, title, color='#2E86AB',
+                           x_label='Predicted Score', y_label='Number of Students'):
+    """
+    Histogram of scores as a Plotly bar trace of pre-computed bin counts.
+
+    Only the bin centres, widths and counts end up in the figure JSON, so
+    its size does not grow with the number of students.
+    """
+    counts, edges = score_histogram(scores, nbins)
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+        marker_color=color,
+        customdata=np.column_stack([edges[:-1], edges[1:]]),
+        hovertemplate=f"{x_label}: %{{customdata[0]:.1f}}-%{{customdata[1]:.1f}}<br>{y_label}: %{{y}}<extra></extra>",
+    ))
+    fig.update_layout(
+        title=title,
+        xaxis_title=x_label,
+        yaxis_title=y_label,
+        bargap=0,
+    )
+    return fig
+
+
+def cached_figure(dataset_version, chart_id, build):
+    """
+    Return the figure for (dataset version, chart id), calling ``build()``
+    only the first time. Figures are shared between sessions and must not be
+    modified after they are returned.
+    """
+    key = (dataset_version, chart_id)
+    fig = _figure_cache.get(key)
+    if fig is None:
+        fig = build()
+        _figure_cache.put(key, fig, len(fig.to_json()))
+    return fig
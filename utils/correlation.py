@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+from utils.lru_cache import LRUCache
+
+# Budget for cached per-dataset statistics (each is a few k x k matrices)
+STATS_CACHE_BYTES = 8 * 1024 * 1024
+
+_stats_cache = LRUCache(STATS_CACHE_BYTES)
+
+
+class CorrelationStats:
+    """
+    Sufficient statistics for pairwise Pearson correlations.
+
+    Keeps, for every pair of numeric columns, the count of rows where both
+    are present and the sums, sums of squares and cross-products over those
+    rows. Rows can be added chunk by chunk with update(); the matrix is then
+    derived in O(k^2) without rescanning the data, and matches
+    DataFrame.corr() (pairwise-complete observations).
+    """
+
+    def __init__(self, columns=None):
+        self.columns = list(columns) if columns is not None else None
+        self.rows = 0
+        self._shift = None
+        self._n = None
+        self._sums = None
+        self._squares = None
+        self._products = None
+
+    def update(self, df):
+        """
+        Add the rows of ``df`` to the statistics
+        """
+        if self.columns is None:
+            self.columns = df.select_dtypes(include=[np.number]).columns.tolist()
+        k = len(self.columns)
+        values = df[self.columns].to_numpy(dtype=float)
+        present = ~np.isnan(values)
+
+        if self._shift is None:
+            # Accumulate around the first chunk's means to limit cancellation error
+            counts = present.sum(axis=0)
+            self._shift = np.nansum(values, axis=0) / np.maximum(counts, 1)
+            self._n = np.zeros((k, k))
+            self._sums = np.zeros((k, k))
+            self._squares = np.zeros((k, k))
+            self._products = np.zeros((k, k))
+
+        centered = np.where(present, values - self._shift, 0.0)
+        mask = present.astype(float)
+        self._n += mask.T @ mask
+        self._sums += centered.T @ mask
+        self._squares += (centered ** 2).T @ mask
+        self._products += centered.T @ centered
+        self.rows += len(values)
+        return self
+
+    def matrix(self):
+        """
+        Correlation matrix as a DataFrame labelled by column name
+        """
+        k = len(self.columns or [])
+        if self._n is None:
+            return pd.DataFrame(np.full((k, k), np.nan), index=self.columns, columns=self.columns)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            n = self._n
+            cov = self._products - self._sums * self._sums.T / n
+            var = self._squares - self._sums ** 2 / n
+            denom = np.sqrt(var * var.T)
+            corr = np.where((n > 1) & (denom > 0), cov / denom, np.nan)
+        corr = np.clip(corr, -1.0, 1.0)
+        diagonal = np.diag(corr).copy()
+        np.fill_diagonal(corr, np.where(np.isnan(diagonal), np.nan, 1.0))
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+    def top_correlations(self, target='Predicted_Score', n=5, corr_matrix=None):
+        """
+        Columns most strongly correlated (in absolute value) with ``target``
+        """
+        if corr_matrix is None:
+            corr_matrix = self.matrix()
+        if target not in corr_matrix.columns:
+            return pd.Series(dtype=float)
+        correlations = corr_matrix[target].abs().sort_values(ascending=False)
+        correlations = correlations[correlations.index != target]
+        return correlations.head(n)
+
+    def nbytes(self):
+        return 4 * (len(self.columns or []) ** 2) * 8
+
+
+def get_correlation_stats(dataset_version, df):
+    """
+    Correlation statistics for a dataset, computed once per dataset version
+    """
+    stats = _stats_cache.get(dataset_version)
+    if stats is None:
+        stats = CorrelationStats().update(df)
+        _stats_cache.put(dataset_version, stats, stats.nbytes())
+    return stats
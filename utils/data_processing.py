@@ -1,25 +1,232 @@
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
-import joblib
+import pyarrow as pa
+import pyarrow.parquet as pq
 from sklearn.preprocessing import LabelEncoder
 import streamlit as st
+from utils.model_registry import registry
+from utils.dataset_store import enable_copy_on_write
 
-def preprocess_data(df):
+# Same pandas semantics from the first dataset on (see utils.dataset_store)
+enable_copy_on_write()
+
+MODEL_PATH = "model.pkl"
+PREPROCESSOR_PATH = "preprocessor.pkl"
+
+# Rows per chunk when scoring large CSVs in streaming mode
+STREAM_CHUNK_ROWS = 50_000
+
+# Worker threads for chunk-parallel scoring, and the smallest row chunk worth
+# handing to a worker (smaller inputs are scored serially)
+SCORING_WORKERS = int(os.environ.get("EDUPREDICT_SCORING_WORKERS", str(os.cpu_count() or 1)))
+PARALLEL_CHUNK_ROWS = 100_000
+
+# Score cut-offs between the risk levels below (a score equal to a cut-off
+# falls into the higher bucket)
+RISK_THRESHOLDS = (40, 50, 70)
+RISK_LEVELS = ["High Risk", "Moderate Risk", "Low Risk", "Excellent"]
+RISK_ICONS = ["🔴", "🟡", "🟢", "🌟"]
+# Cell style per risk level, used to colour predicted scores in results tables
+RISK_CELL_STYLES = [
+    f'background-color: {color}; color: white; font-weight: bold; border-radius: 6px;'
+    for color in ("#ef4444", "#f59e0b", "#10b981", "#8b5cf6")
+]
+
+# Encodings applied to the binary Yes/No and Male/Female columns
+BINARY_MAPS = {
+    "Gender": {'Male': 0, 'Female': 1},
+    "Internet_Access_at_Home": {'Yes': 1, 'No': 0},
+    "Extracurricular_Activities": {'Yes': 1, 'No': 0},
+}
+
+# Label-encoded columns (codes follow sorted category order, like LabelEncoder)
+CATEGORICAL_COLS = ["Parental_Education_Level"]
+
+# Columns that are never model features
+NON_FEATURE_COLS = ["Student_ID", "Pass_Fail", "Final_Exam_Score", "Predicted_Score"]
+
+# Declared dtypes of the student columns, so CSV parsing doesn't have to infer
+# them; low-cardinality text columns are parsed straight into categoricals
+STUDENT_SCHEMA = {
+    "Student_ID": "str",
+    "Age": "float64",
+    "Gender": "category",
+    "Study_Hours_per_Week": "float64",
+    "Attendance_Rate": "float64",
+    "Past_Exam_Scores": "float64",
+    "Previous_Grade": "category",
+    "Parental_Education_Level": "category",
+    "Internet_Access_at_Home": "category",
+    "Extracurricular_Activities": "category",
+    "Family_Income_Level": "category",
+}
+
+# Upload formats by file extension; columnar files are read with column projection
+UPLOAD_FORMATS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+}
+
+def fit_preprocessor(df):
+    """
+    Fit the preprocessing artifact on training data.
+
+    Holds the binary maps, the category vocabulary and lookup table of each
+    label-encoded column, and the feature column order the model was trained on.
+    """
+    categories = {}
+    lookups = {}
+    for col in CATEGORICAL_COLS:
+        vocabulary = sorted(df[col].dropna().unique().tolist())
+        categories[col] = vocabulary
+        lookups[col] = {value: code for code, value in enumerate(vocabulary)}
+    
+    return {
+        'binary_maps': {col: dict(mapping) for col, mapping in BINARY_MAPS.items()},
+        'categories': categories,
+        'lookups': lookups,
+        'feature_columns': [col for col in df.columns if col not in NON_FEATURE_COLS],
+    }
+
+def load_preprocessor(path=PREPROCESSOR_PATH):
+    """
+    Load the fitted preprocessing artifact saved by main.py, or None if missing
+    """
+    try:
+        return registry.get(path)
+    except FileNotFoundError:
+        return None
+
+def ingest_columns(preprocessor=None):
+    """
+    Columns the app needs from an upload: Student_ID plus the model features,
+    or None (read everything) when no fitted preprocessor is available
+    """
+    if preprocessor is None:
+        preprocessor = load_preprocessor()
+    if preprocessor is None:
+        return None
+    return ["Student_ID"] + preprocessor['feature_columns']
+
+def read_columnar(data, fmt, columns=None):
+    """
+    Read Parquet or Arrow IPC bytes into a DataFrame, decoding only ``columns``.
+
+    Requested columns the file doesn't have are skipped, so a missing feature
+    is reported by preprocess_data like it is for CSV uploads.
+    """
+    if fmt == "parquet":
+        # Dictionary-decode the categorical columns so they arrive as pandas
+        # categoricals; pyarrow rejects names the file doesn't have
+        names = pq.read_schema(pa.BufferReader(data)).names
+        categorical = [col for col, dtype in STUDENT_SCHEMA.items() if dtype == "category" and col in names]
+        parquet_file = pq.ParquetFile(pa.BufferReader(data), read_dictionary=categorical)
+        table = parquet_file.read(columns=[col for col in columns if col in names] if columns else None)
+    else:
+        # Feather v2 / Arrow IPC file format, falling back to the streaming format
+        try:
+            table = pa.ipc.open_file(pa.BufferReader(data)).read_all()
+        except pa.ArrowInvalid:
+            table = pa.ipc.open_stream(pa.BufferReader(data)).read_all()
+        if columns:
+            table = table.select([col for col in columns if col in table.column_names])
+    return table.to_pandas()
+
+def read_student_csv(data, preprocessor=None):
+    """
+    Parse CSV bytes with the multithreaded pyarrow engine and STUDENT_SCHEMA.
+
+    Only the header is read to decide which columns to load (see
+    ingest_columns); every declared column gets its dtype up front.
+    """
+    header = pd.read_csv(io.BytesIO(data), nrows=0).columns
+    wanted = ingest_columns(preprocessor)
+    usecols = [col for col in header if wanted is None or col in wanted]
+    dtype = {col: STUDENT_SCHEMA[col] for col in usecols if col in STUDENT_SCHEMA}
+    return pd.read_csv(io.BytesIO(data), engine="pyarrow", usecols=usecols, dtype=dtype)
+
+def read_student_file(data, filename, preprocessor=None):
+    """
+    Load uploaded student data (CSV, Parquet or Arrow IPC) from raw bytes
+    """
+    fmt = UPLOAD_FORMATS.get(os.path.splitext(filename)[1].lower())
+    if fmt is None:
+        raise ValueError(f"Unsupported file type: {filename}")
+    if fmt == "csv":
+        return read_student_csv(data, preprocessor)
+    return read_columnar(data, fmt, ingest_columns(preprocessor))
+
+def to_parquet_bytes(df):
+    """
+    Serialize a (scored) dataset as Parquet, keeping categorical columns
+    """
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+def _encode_column(series, lookup, col):
+    """
+    Map a column through a fitted lookup table, rejecting unseen values.
+
+    Categorical columns are encoded by mapping their few categories once and
+    indexing the result with the category codes.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        category_codes = pd.Series(series.cat.categories).map(lookup).to_numpy(dtype=float)
+        codes = series.cat.codes.to_numpy()
+        encoded = pd.Series(np.where(codes >= 0, category_codes[codes], np.nan), index=series.index)
+    else:
+        encoded = series.map(lookup)
+    if encoded.isna().any():
+        unknown = series[encoded.isna()].unique()[:5]
+        raise ValueError(f"Unrecognised values in '{col}': {', '.join(map(str, unknown))}")
+    return encoded.astype(np.int8)
+
+def preprocess_data(df, preprocessor=None):
     """
     Preprocess the student data for prediction
     """
+    if preprocessor is None:
+        preprocessor = load_preprocessor()
+    if preprocessor is None:
+        return _preprocess_unfitted(df)
+    
+    missing = [col for col in preprocessor['feature_columns'] if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+    
+    # Build only the feature frame; untouched columns share the original data
+    features = {}
+    for col in preprocessor['feature_columns']:
+        if col in preprocessor['binary_maps']:
+            features[col] = _encode_column(df[col], preprocessor['binary_maps'][col], col)
+        elif col in preprocessor['lookups']:
+            features[col] = _encode_column(df[col], preprocessor['lookups'][col], col)
+        else:
+            features[col] = df[col]
+    
+    return pd.DataFrame(features, index=df.index)
+
+def _preprocess_unfitted(df):
+    """
+    Fallback used when no fitted preprocessor is available: encodes the
+    batch on its own, so codes depend on the categories present in ``df``
+    """
     # Make a copy to avoid modifying the original
     df_processed = df.copy()
     
     # Binary encoding for categorical variables
-    binary_cols = ["Gender", "Internet_Access_at_Home", "Extracurricular_Activities"]
-    
-    for col in binary_cols:
+    for col, mapping in BINARY_MAPS.items():
         if col in df_processed.columns:
-            if col == "Gender":
-                df_processed[col] = df_processed[col].map({'Male': 0, 'Female': 1})
-            else:
-                df_processed[col] = df_processed[col].map({'Yes': 1, 'No': 0})
+            df_processed[col] = df_processed[col].map(mapping)
     
     # Encode parental education level
     if "Parental_Education_Level" in df_processed.columns:
@@ -28,27 +235,76 @@ def preprocess_data(df):
     
     return df_processed
 
-def load_model():
+def load_model(path=MODEL_PATH):
     """
-    Load the trained model
+    Load the trained model (cached process-wide, reloaded when the file changes)
     """
     try:
-        model = joblib.load("model.pkl")
-        return model
+        return registry.get(path)
     except FileNotFoundError:
         st.error("Model file 'model.pkl' not found. Please ensure the model file is in the root directory.")
         return None
 
-def make_predictions(df, model):
+def get_model_version(path=MODEL_PATH, preprocessor_path=PREPROCESSOR_PATH):
     """
-    Make predictions on the preprocessed data
+    Content hash of the model (and fitted preprocessor) currently in use, for
+    keying cached results
+    """
+    version = registry.version(path)
+    if os.path.exists(preprocessor_path):
+        version = f"{version}-{registry.version(preprocessor_path)[:16]}"
+    return version
+
+def get_model_stats():
+    """
+    Load counts and load latency for every cached model artifact
+    """
+    return registry.stats()
+
+_scoring_pool = None
+_scoring_pool_lock = threading.Lock()
+
+def _row_chunks(n_rows, n_jobs):
+    """
+    Split ``n_rows`` into at most ``n_jobs`` contiguous slices of at least
+    PARALLEL_CHUNK_ROWS rows each
+    """
+    n_chunks = max(1, min(n_jobs, n_rows // PARALLEL_CHUNK_ROWS))
+    bounds = np.linspace(0, n_rows, n_chunks + 1).astype(int)
+    return [slice(start, stop) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+def _map_row_chunks(func, n_rows, n_jobs=None):
+    """
+    Apply ``func`` to row slices on the shared scoring pool, in order.
+
+    numpy and the model's predict release the GIL in their inner loops, so
+    threads score chunks in parallel without copying the data to processes.
+    """
+    chunks = _row_chunks(n_rows, SCORING_WORKERS if n_jobs is None else n_jobs)
+    if len(chunks) == 1:
+        return [func(chunks[0])]
+    
+    global _scoring_pool
+    with _scoring_pool_lock:
+        if _scoring_pool is None:
+            _scoring_pool = ThreadPoolExecutor(max_workers=SCORING_WORKERS, thread_name_prefix="scoring")
+    return list(_scoring_pool.map(func, chunks))
+
+def make_predictions(df, model, n_jobs=None):
+    """
+    Make predictions on the preprocessed data.
+
+    Large inputs are split into row chunks scored on up to ``n_jobs``
+    threads (default SCORING_WORKERS); every row is scored exactly as in
+    the serial path, so the result is identical.
     """
     # Select features for prediction (exclude ID and target columns)
     feature_cols = [col for col in df.columns 
                    if col not in ["Student_ID", "Pass_Fail", "Final_Exam_Score", "Predicted_Score"]]
     
     X = df[feature_cols]
-    predictions = model.predict(X)
+    chunks = _map_row_chunks(lambda rows: model.predict(X.iloc[rows]), len(X), n_jobs)
+    predictions = chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
     
     return predictions
 
@@ -65,27 +321,169 @@ def categorize_risk_level(score):
     else:
         return "Excellent", "🌟"
 
-def get_student_insights(df):
+def bucket_risk_levels(scores, thresholds=RISK_THRESHOLDS, levels=RISK_LEVELS, icons=RISK_ICONS, n_jobs=None):
+    """
+    Vectorized equivalent of categorize_risk_level over a whole score array.
+
+    Returns the bucket code of every score, the Risk_Level and Risk_Icon
+    columns as categoricals sharing those codes, and the count per level.
+    Large arrays are bucketed in row chunks on up to ``n_jobs`` threads.
+    """
+    if len(levels) != len(thresholds) + 1 or len(icons) != len(levels):
+        raise ValueError("Need exactly one level and one icon per threshold bucket")
+    
+    scores = np.asarray(scores, dtype=float)
+    bounds = np.asarray(thresholds, dtype=float)
+    codes = np.empty(len(scores), dtype=np.int8)
+    
+    def bucket_chunk(rows):
+        # NaN sorts past every threshold, matching categorize_risk_level
+        codes[rows] = np.searchsorted(bounds, scores[rows], side='right')
+        return np.bincount(codes[rows], minlength=len(levels))
+    
+    counts = np.sum(_map_row_chunks(bucket_chunk, len(scores), n_jobs), axis=0)
+    
+    return {
+        'codes': codes,
+        'levels': pd.Categorical.from_codes(codes, categories=levels),
+        'icons': pd.Categorical.from_codes(codes, categories=icons),
+        'counts': dict(zip(levels, counts.tolist())),
+    }
+
+def score_dataframe(df, model, preprocessor=None, n_jobs=None):
+    """
+    Add Predicted_Score, Risk_Level and Risk_Icon columns to ``df`` in place
+    and return the number of students per risk level
+    """
+    df_processed = preprocess_data(df, preprocessor)
+    df['Predicted_Score'] = make_predictions(df_processed, model, n_jobs)
+    
+    buckets = bucket_risk_levels(df['Predicted_Score'].to_numpy(), n_jobs=n_jobs)
+    df['Risk_Level'] = pd.Series(buckets['levels'], index=df.index)
+    df['Risk_Icon'] = pd.Series(buckets['icons'], index=df.index)
+    return buckets['counts']
+
+def compact_scored_dataset(df, preprocessor=None):
+    """
+    Shrink a scored dataset before it is kept in memory for a session.
+
+    Drops columns no page reads (anything but Student_ID, the model features
+    and the score columns), downcasts numeric columns to the narrowest dtype
+    that holds every value exactly, and turns repetitive text columns into
+    categoricals. Predicted_Score keeps full precision, since the pages
+    compare it against the risk thresholds.
+    """
+    wanted = ingest_columns(preprocessor)
+    keep = None if wanted is None else set(wanted) | {'Predicted_Score', 'Risk_Level', 'Risk_Icon'}
+    
+    columns = {}
+    for col in df.columns:
+        if keep is not None and col not in keep:
+            continue
+        series = df[col]
+        if col == 'Predicted_Score' or isinstance(series.dtype, pd.CategoricalDtype):
+            pass
+        elif pd.api.types.is_bool_dtype(series):
+            pass
+        elif pd.api.types.is_integer_dtype(series):
+            series = pd.to_numeric(series, downcast='integer')
+        elif pd.api.types.is_float_dtype(series):
+            values = series.to_numpy()
+            if not np.isnan(values).any() and np.array_equal(values, np.round(values)):
+                series = pd.to_numeric(series.astype(np.int64), downcast='integer')
+            elif np.array_equal(values.astype(np.float32).astype(values.dtype), values, equal_nan=True):
+                series = series.astype(np.float32)
+        elif series.nunique() <= len(series) // 2:
+            series = series.astype('category')
+        columns[col] = series
+    
+    return pd.DataFrame(columns, index=df.index)
+
+def stream_predictions(source, model, chunksize=STREAM_CHUNK_ROWS, output=None, correlation=None, n_jobs=None):
+    """
+    Score a CSV chunk by chunk so memory stays bounded by the chunk size.
+
+    Only the score column and the risk-bucket counters are kept. When
+    ``output`` (a path or writable text buffer) is given, each scored chunk is
+    appended to it as CSV as soon as it is ready. When ``correlation`` (a
+    utils.correlation.CorrelationStats) is given, every scored chunk is added
+    to it. ``n_jobs`` is passed on to score_dataframe.
+    """
+    scores = []
+    risk_counts = dict.fromkeys(RISK_LEVELS, 0)
+    rows = 0
+    
+    # Every chunk goes through the same fitted encodings
+    preprocessor = load_preprocessor()
+    
+    out = open(output, "w", newline="") if isinstance(output, (str, os.PathLike)) else output
+    try:
+        for chunk in pd.read_csv(source, chunksize=chunksize):
+            chunk_counts = score_dataframe(chunk, model, preprocessor, n_jobs)
+            
+            scores.append(chunk['Predicted_Score'].to_numpy())
+            if correlation is not None:
+                correlation.update(chunk)
+            for level, count in chunk_counts.items():
+                risk_counts[level] += count
+            
+            if out is not None:
+                chunk.to_csv(out, header=(rows == 0), index=False)
+            rows += len(chunk)
+    finally:
+        if out is not None and out is not output:
+            out.close()
+    
+    return {
+        'rows': rows,
+        'scores': np.concatenate(scores) if scores else np.empty(0),
+        'risk_counts': risk_counts,
+    }
+
+def summarize_risk(df):
+    """
+    Risk-bucket counts and average score for a scored dataset, in one pass.
+
+    Reuses the Risk_Level codes written by score_dataframe when present
+    instead of re-comparing every score against each threshold.
+    """
+    risk_level = df.get('Risk_Level')
+    is_bucketed = (risk_level is not None
+                   and isinstance(risk_level.dtype, pd.CategoricalDtype)
+                   and list(risk_level.cat.categories) == RISK_LEVELS)
+    if is_bucketed:
+        counts = np.bincount(risk_level.cat.codes.to_numpy(), minlength=len(RISK_LEVELS)).tolist()
+    else:
+        counts = list(bucket_risk_levels(df['Predicted_Score'].to_numpy())['counts'].values())
+    
+    high_risk, moderate_risk, low_risk, excellent = counts
+    mean_score = df['Predicted_Score'].mean()
+    return {
+        'total_students': len(df),
+        'mean_score': mean_score,
+        'avg_score': round(mean_score, 2),
+        'high_risk': high_risk,
+        'moderate_risk': moderate_risk,
+        'low_risk': low_risk,
+        'excellent': excellent,
+        'at_risk': high_risk + moderate_risk,
+        'score_distribution': {
+            'Below 40': high_risk,
+            '40-50': moderate_risk,
+            '50-70': low_risk,
+            '70+': excellent
+        },
+    }
+
+def get_student_insights(df, summary=None):
     """
     Generate insights about the student data
     """
     insights = {}
     
     if 'Predicted_Score' in df.columns:
-        insights['total_students'] = len(df)
-        insights['avg_score'] = round(df['Predicted_Score'].mean(), 2)
-        insights['high_risk'] = len(df[df['Predicted_Score'] < 40])
-        insights['moderate_risk'] = len(df[(df['Predicted_Score'] >= 40) & (df['Predicted_Score'] < 50)])
-        insights['low_risk'] = len(df[(df['Predicted_Score'] >= 50) & (df['Predicted_Score'] < 70)])
-        insights['excellent'] = len(df[df['Predicted_Score'] >= 70])
-        
-        # Performance distribution
-        insights['score_distribution'] = {
-            'Below 40': insights['high_risk'],
-            '40-50': insights['moderate_risk'], 
-            '50-70': insights['low_risk'],
-            '70+': insights['excellent']
-        }
+        # Counts come from the shared per-dataset summary when available
+        insights.update(summary if summary is not None else summarize_risk(df))
         
         # Gender analysis if available
         if 'Gender' in df.columns:
@@ -106,21 +504,22 @@ def highlight_risk_score(val):
     if pd.isna(val):
         return ''
     
+    high_risk, moderate_risk, low_risk, excellent = RISK_CELL_STYLES
     if val < 40:
-        return 'background-color: #ef4444; color: white; font-weight: bold; border-radius: 6px;'
+        return high_risk
     elif val < 50:
-        return 'background-color: #f59e0b; color: white; font-weight: bold; border-radius: 6px;'
+        return moderate_risk
     elif val < 70:
-        return 'background-color: #10b981; color: white; font-weight: bold; border-radius: 6px;'
+        return low_risk
     else:
-        return 'background-color: #8b5cf6; color: white; font-weight: bold; border-radius: 6px;'
+        return excellent
 
-def create_sample_data():
+def create_sample_data(n_students=100, seed=42):
     """
-    Create sample data for demonstration purposes
+    Create sample data for demonstration purposes (and synthetic rosters of
+    any size for benchmarks)
     """
-    np.random.seed(42)
-    n_students = 100
+    np.random.seed(seed)
     
     sample_data = {
         'Student_ID': [f'STU{i:03d}' for i in range(1, n_students + 1)],
@@ -129,10 +528,11 @@ def create_sample_data():
         'Study_Hours_per_Week': np.random.randint(5, 40, n_students),
         'Attendance_Rate': np.random.uniform(60, 100, n_students),
         'Previous_Grade': np.random.choice(['A', 'B', 'C', 'D'], n_students, p=[0.2, 0.3, 0.3, 0.2]),
-        'Parental_Education_Level': np.random.choice(['High School', 'Bachelor', 'Master', 'PhD'], n_students, p=[0.3, 0.4, 0.2, 0.1]),
+        'Parental_Education_Level': np.random.choice(['High School', 'Bachelors', 'Masters', 'PhD'], n_students, p=[0.3, 0.4, 0.2, 0.1]),
         'Internet_Access_at_Home': np.random.choice(['Yes', 'No'], n_students, p=[0.8, 0.2]),
         'Extracurricular_Activities': np.random.choice(['Yes', 'No'], n_students, p=[0.6, 0.4]),
-        'Family_Income_Level': np.random.choice(['Low', 'Medium', 'High'], n_students, p=[0.3, 0.5, 0.2])
+        'Family_Income_Level': np.random.choice(['Low', 'Medium', 'High'], n_students, p=[0.3, 0.5, 0.2]),
+        'Past_Exam_Scores': np.random.randint(40, 101, n_students)
     }
     
     return pd.DataFrame(sample_data)
\ No newline at end of file
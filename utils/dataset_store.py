@@ -0,0 +1,101 @@
+import threading
+import weakref
+
+from utils.prediction_cache import dataframe_nbytes
+
+
+def enable_copy_on_write():
+    """
+    Turn on pandas copy-on-write, which DatasetHandle relies on to keep
+    shared frames read-only. It is always on from pandas 3.0; on pandas 2.x
+    a write through one session's view would otherwise change every
+    session's data.
+    """
+    # Imported here: this module is loaded for the sign-in page, before pandas is needed
+    import pandas as pd
+    if int(pd.__version__.split(".")[0]) < 3 and not pd.get_option("mode.copy_on_write"):
+        pd.set_option("mode.copy_on_write", True)
+
+
+class DatasetHandle:
+    """
+    A session's reference to a dataset in the shared store.
+
+    ``df`` is a shallow view of the shared frame: it reads the same column
+    buffers without copying them, and pandas copy-on-write copies a column
+    only if this session ever modifies it, so the shared data stays
+    read-only. The reference is released when the handle is garbage
+    collected (e.g. when its Streamlit session expires) or release() is called.
+    """
+
+    __slots__ = ('version', 'df', '_finalizer', '__weakref__')
+
+    def __init__(self, store, version, df):
+        enable_copy_on_write()
+        self.version = version
+        self.df = df.copy(deep=False)
+        self._finalizer = weakref.finalize(self, store._release, version)
+
+    def release(self):
+        self._finalizer()
+
+
+class DatasetStore:
+    """
+    Process-wide, content-addressed store of scored datasets.
+
+    Sessions that scored the same roster (same dataset version) share one
+    DataFrame. Each entry counts the handles that reference it and is
+    dropped when the last one is released.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def acquire(self, version, df=None):
+        """
+        Return a new handle on the dataset stored under ``version``.
+
+        If no session holds that version yet, ``df`` is stored under it; if
+        ``df`` is None too, returns None.
+        """
+        with self._lock:
+            entry = self._entries.get(version)
+            if entry is None:
+                if df is None:
+                    return None
+                entry = {'df': df, 'refs': 0, 'nbytes': dataframe_nbytes(df)}
+                self._entries[version] = entry
+            entry['refs'] += 1
+            return DatasetHandle(self, version, entry['df'])
+
+    def _release(self, version):
+        with self._lock:
+            entry = self._entries.get(version)
+            if entry is None:
+                return
+            entry['refs'] -= 1
+            if entry['refs'] <= 0:
+                del self._entries[version]
+
+    def refs(self, version):
+        """Number of live handles on ``version``"""
+        with self._lock:
+            entry = self._entries.get(version)
+            return entry['refs'] if entry is not None else 0
+
+    def stats(self):
+        """
+        Datasets held, live handles and the memory they share
+        """
+        with self._lock:
+            return {
+                'datasets': len(self._entries),
+                'handles': sum(entry['refs'] for entry in self._entries.values()),
+                'bytes': sum(entry['nbytes'] for entry in self._entries.values()),
+            }
+
+
+# Shared by every Streamlit session running in this process
+dataset_store = DatasetStore()
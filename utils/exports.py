@@ -0,0 +1,125 @@
+import gzip
+import io
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+
+from utils.data_processing import STREAM_CHUNK_ROWS
+from utils.lru_cache import LRUCache
+from utils.results_table import view_index
+
+# Budget for generated report files, shared between sessions
+EXPORT_CACHE_BYTES = 256 * 1024 * 1024
+
+# Rows serialized at a time while writing a report
+EXPORT_CHUNK_ROWS = STREAM_CHUNK_ROWS
+
+_export_cache = LRUCache(EXPORT_CACHE_BYTES)
+
+# Report name -> (file name, results view, button label)
+REPORTS = {
+    'scored': ("scored_students", 'all', "Scored Results"),
+    'at_risk': ("at_risk_students", 'at_risk', "At-Risk Students Report"),
+    'top': ("top_performers", 'top', "Top Performers Report"),
+}
+
+# Format -> (label, file extension, MIME type)
+EXPORT_FORMATS = {
+    'csv': ("CSV", ".csv", "text/csv"),
+    'csv.gz': ("CSV (gzip)", ".csv.gz", "application/gzip"),
+    'parquet': ("Parquet", ".parquet", "application/vnd.apache.parquet"),
+}
+
+
+def _row_chunks(rows):
+    for start in range(0, len(rows), EXPORT_CHUNK_ROWS):
+        yield rows[start:start + EXPORT_CHUNK_ROWS]
+
+
+def _write_csv(df, rows, out):
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+    try:
+        if len(rows) == 0:
+            df.iloc[:0].to_csv(text, index=False)
+        for i, chunk_rows in enumerate(_row_chunks(rows)):
+            df.iloc[chunk_rows].to_csv(text, header=(i == 0), index=False)
+    finally:
+        # Leave ``out`` open for the caller
+        text.detach()
+
+
+def _write_parquet(df, rows, out):
+    writer = None
+    try:
+        for chunk_rows in _row_chunks(rows):
+            table = pa.Table.from_pandas(df.iloc[chunk_rows], preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(out, table.schema)
+            writer.write_table(table)
+        if writer is None:
+            pq.write_table(pa.Table.from_pandas(df.iloc[:0], preserve_index=False), out)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def write_export(df, rows, fmt, out):
+    """
+    Write the rows at positions ``rows`` of ``df`` to the binary file object
+    ``out`` in ``fmt``, EXPORT_CHUNK_ROWS rows at a time
+    """
+    if fmt == 'csv':
+        _write_csv(df, rows, out)
+    elif fmt == 'csv.gz':
+        # mtime=0 keeps the bytes identical for identical data
+        with gzip.GzipFile(fileobj=out, mode="wb", mtime=0) as compressed:
+            _write_csv(df, rows, compressed)
+    elif fmt == 'parquet':
+        _write_parquet(df, rows, out)
+    else:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+
+def export_bytes(df, dataset_version, report, fmt):
+    """
+    The ``report`` of a scored dataset as a file in ``fmt``, generated on
+    first request and then served from the cache for that dataset version
+    """
+    key = (dataset_version, report, fmt)
+    data = _export_cache.get(key)
+    if data is None:
+        rows = view_index(df, dataset_version, REPORTS[report][1])
+        buffer = io.BytesIO()
+        write_export(df, rows, fmt, buffer)
+        data = buffer.getvalue()
+        _export_cache.put(key, data, len(data))
+    return data
+
+
+def show_export_button(df, dataset_version, report, default_format='csv'):
+    """
+    Format picker and download button for a report; the file is only
+    generated when the button is clicked
+    """
+    file_name, _, label = REPORTS[report]
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        fmt = st.selectbox(
+            "Format",
+            list(EXPORT_FORMATS),
+            index=list(EXPORT_FORMATS).index(default_format),
+            format_func=lambda f: EXPORT_FORMATS[f][0],
+            key=f"export_format_{report}",
+            label_visibility="collapsed"
+        )
+    format_label, extension, mime = EXPORT_FORMATS[fmt]
+    with col2:
+        st.download_button(
+            label=f"Download {label} ({format_label})",
+            data=lambda: export_bytes(df, dataset_version, report, fmt),
+            file_name=file_name + extension,
+            mime=mime,
+            on_click="ignore",
+            use_container_width=True
+        )
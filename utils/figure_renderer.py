@@ -0,0 +1,61 @@
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from matplotlib.figure import Figure
+
+from utils.lru_cache import LRUCache
+
+# Budget for cached PNG renders, shared by all sessions
+PNG_CACHE_BYTES = int(os.environ.get("EDUPREDICT_FIGURE_CACHE_MB", "128")) * 1024 * 1024
+
+# Same output settings st.pyplot uses by default
+SAVEFIG_KWARGS = {'format': 'png', 'dpi': 200, 'bbox_inches': 'tight'}
+
+_png_cache = LRUCache(PNG_CACHE_BYTES)
+_render_pool = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1),
+                                  thread_name_prefix="figure-render")
+
+
+def render_png(draw, figsize=(8, 6)):
+    """
+    Render one chart to PNG bytes.
+
+    ``draw(fig)`` receives a fresh matplotlib Figure. It is built without
+    pyplot, so it never enters pyplot's global registry, and it is cleared
+    as soon as the PNG has been written.
+    """
+    fig = Figure(figsize=figsize)
+    try:
+        draw(fig)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, **SAVEFIG_KWARGS)
+        return buffer.getvalue()
+    finally:
+        fig.clear()
+
+
+def render_figures(dataset_version, charts):
+    """
+    Return {chart_id: png_bytes} for ``charts``, a list of
+    (chart_id, draw, figsize) tuples.
+
+    Renders are cached per (dataset version, chart id). Charts missing from
+    the cache are rendered concurrently on a shared thread pool.
+    """
+    pngs = {}
+    pending = {}
+    for chart_id, draw, figsize in charts:
+        key = (dataset_version, chart_id)
+        png = _png_cache.get(key)
+        if png is None:
+            pending[chart_id] = _render_pool.submit(render_png, draw, figsize)
+        else:
+            pngs[chart_id] = png
+
+    for chart_id, future in pending.items():
+        png = future.result()
+        _png_cache.put((dataset_version, chart_id), png, len(png))
+        pngs[chart_id] = png
+
+    return pngs
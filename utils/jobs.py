@@ -0,0 +1,190 @@
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils.data_processing import (
+    read_student_file, preprocess_data, make_predictions, bucket_risk_levels,
+    compact_scored_dataset, summarize_risk, SCORING_WORKERS
+)
+from utils.prediction_cache import prediction_cache, dataframe_nbytes
+
+# Uploads at least this large are scored as a background job
+BACKGROUND_JOB_MIN_BYTES = int(os.environ.get("EDUPREDICT_BACKGROUND_JOB_MB", "25")) * 1024 * 1024
+
+# Concurrent background jobs per server process
+MAX_JOB_WORKERS = int(os.environ.get("EDUPREDICT_JOB_WORKERS", "2"))
+
+# Rows scored per scoring thread between progress updates and cancellation checks
+PREDICT_CHUNK_ROWS = 100_000
+
+STAGES = ("parse", "preprocess", "predict", "bucket", "summarize")
+
+STAGE_LABELS = {
+    "parse": "Reading your data",
+    "preprocess": "Preparing features",
+    "predict": "Predicting scores",
+    "bucket": "Classifying risk levels",
+    "summarize": "Summarizing results",
+}
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class ScoringJob:
+    """
+    Scores one uploaded file off the Streamlit script thread.
+
+    The job runs the stages in STAGES order and keeps each stage's output,
+    so a cancelled or failed job resubmitted later resumes at the first
+    stage that hasn't completed. ``status`` is one of queued, running,
+    done, failed or cancelled.
+    """
+
+    def __init__(self, key, data, filename, model):
+        self.key = key
+        self.filename = filename
+        self.model = model
+        self.data = data
+        self.outputs = {}
+        self.timings = {}
+        self.status = "queued"
+        self.stage = None
+        self.stage_progress = 0.0
+        self.error = None
+        self._cancel = threading.Event()
+
+    @property
+    def progress(self):
+        """Overall completion between 0 and 1"""
+        if self.status == "done":
+            return 1.0
+        done = sum(stage in self.outputs for stage in STAGES)
+        current = self.stage_progress if self.stage not in self.outputs else 0.0
+        return min((done + current) / len(STAGES), 1.0)
+
+    @property
+    def result(self):
+        """
+        Prediction cache entry for the scored upload, once the job is done
+        """
+        return self.outputs.get("summarize")
+
+    def cancel(self):
+        self._cancel.set()
+
+    def run(self):
+        self.status = "running"
+        self.error = None
+        try:
+            for stage in STAGES:
+                if stage in self.outputs:
+                    continue
+                self._check_cancelled()
+                self.stage = stage
+                self.stage_progress = 0.0
+                start = time.perf_counter()
+                self.outputs[stage] = getattr(self, f"_{stage}")()
+                self.timings[stage] = time.perf_counter() - start
+            # Only the final entry is needed once every stage has completed
+            self.outputs = {"summarize": self.outputs["summarize"]}
+            self.data = None
+            self.status = "done"
+        except JobCancelled:
+            self.status = "cancelled"
+        except Exception as e:
+            self.error = str(e)
+            self.status = "failed"
+
+    def _check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def _parse(self):
+        df = read_student_file(self.data, self.filename)
+        return {
+            'df': df,
+            'raw_columns': list(df.columns),
+            'missing_values': int(df.isnull().sum().sum()),
+        }
+
+    def _preprocess(self):
+        return preprocess_data(self.outputs["parse"]["df"])
+
+    def _predict(self):
+        features = self.outputs["preprocess"]
+        n_rows = len(features)
+        step = PREDICT_CHUNK_ROWS * SCORING_WORKERS
+        scores = []
+        for start in range(0, n_rows, step):
+            self._check_cancelled()
+            scores.append(make_predictions(features.iloc[start:start + step], self.model))
+            self.stage_progress = min(start + step, n_rows) / n_rows
+        return np.concatenate(scores) if scores else np.empty(0)
+
+    def _bucket(self):
+        # Shallow copy: the parsed frame stays as it was if this stage is retried
+        df = self.outputs["parse"]["df"].copy(deep=False)
+        df['Predicted_Score'] = self.outputs["predict"]
+        buckets = bucket_risk_levels(df['Predicted_Score'].to_numpy())
+        df['Risk_Level'] = pd.Series(buckets['levels'], index=df.index)
+        df['Risk_Icon'] = pd.Series(buckets['icons'], index=df.index)
+        return compact_scored_dataset(df)
+
+    def _summarize(self):
+        df = self.outputs["bucket"]
+        entry = {
+            'df': df,
+            'raw_columns': self.outputs["parse"]["raw_columns"],
+            'missing_values': self.outputs["parse"]["missing_values"],
+            'risk_summary': summarize_risk(df),
+        }
+        prediction_cache.put(self.key, entry, dataframe_nbytes(df))
+        return entry
+
+
+class JobManager:
+    """
+    Worker pool for scoring jobs, deduplicated by upload cache key.
+
+    Jobs are only referenced weakly here; the sessions waiting on a job keep
+    it alive, and the pool holds it while it runs.
+    """
+
+    def __init__(self, max_workers=MAX_JOB_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scoring-job")
+        self._jobs = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def submit(self, key, data, filename, model):
+        """
+        Start scoring an upload, or return the job already scoring it
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None:
+                job = ScoringJob(key, data, filename, model)
+                self._jobs[key] = job
+                self._executor.submit(job.run)
+            return job
+
+    def resubmit(self, job):
+        """
+        Run a cancelled or failed job again from its first unfinished stage
+        """
+        with self._lock:
+            if job.status not in ("cancelled", "failed"):
+                return
+            job._cancel.clear()
+            job.status = "queued"
+            self._executor.submit(job.run)
+
+
+# Shared by every Streamlit session running in this process
+job_manager = JobManager()
@@ -0,0 +1,109 @@
+import hashlib
+import os
+import threading
+import time
+
+import joblib
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of joblib artifacts (model.pkl and friends).
+
+    Each artifact is unpickled once and shared by every session. It is
+    reloaded only when the file's mtime changes *and* its content hash
+    differs from the one already loaded, so touching the file is cheap.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._stats = {}
+
+    def get(self, path):
+        """
+        Return the loaded artifact at ``path``, reloading it if the file changed
+        """
+        path = os.path.abspath(path)
+        mtime = os.stat(path).st_mtime_ns
+
+        entry = self._entries.get(path)
+        if entry is not None and entry['mtime'] == mtime:
+            self._stats[path]['hits'] += 1
+            return entry['artifact']
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry['mtime'] == mtime:
+                self._stats[path]['hits'] += 1
+                return entry['artifact']
+
+            digest = file_digest(path)
+            stats = self._stats.setdefault(path, {
+                'loads': 0,
+                'hits': 0,
+                'last_load_seconds': None,
+                'total_load_seconds': 0.0,
+            })
+
+            # mtime moved but the bytes are identical: keep the loaded object
+            if entry is not None and entry['digest'] == digest:
+                entry['mtime'] = mtime
+                stats['hits'] += 1
+                return entry['artifact']
+
+            start = time.perf_counter()
+            artifact = joblib.load(path)
+            elapsed = time.perf_counter() - start
+
+            stats['loads'] += 1
+            stats['last_load_seconds'] = elapsed
+            stats['total_load_seconds'] += elapsed
+
+            self._entries[path] = {
+                'artifact': artifact,
+                'mtime': mtime,
+                'digest': digest,
+            }
+            return artifact
+
+    def version(self, path):
+        """
+        Return the content hash of the currently loaded artifact at ``path``
+        """
+        self.get(path)
+        return self._entries[os.path.abspath(path)]['digest']
+
+    def stats(self):
+        """
+        Return load counts and load latency for every artifact seen so far
+        """
+        with self._lock:
+            return {
+                path: dict(stats, version=self._entries[path]['digest'])
+                for path, stats in self._stats.items()
+                if path in self._entries
+            }
+
+    def clear(self):
+        """
+        Drop every cached artifact so the next get() reloads from disk
+        """
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """
+    SHA-256 hex digest of a file, read in chunks
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Shared by every Streamlit session running in this process
+registry = ModelRegistry()
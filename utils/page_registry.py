@@ -0,0 +1,39 @@
+import importlib
+import sys
+import time
+
+# Page modules by page key, in the order the warm-up imports them.
+# Importing a page pulls in its plotting and ML stack (pandas, scikit-learn,
+# matplotlib, seaborn, plotly), so nothing is imported until it is needed.
+PAGE_MODULES = {
+    "login": "modules.login",
+    "signup": "modules.signup",
+    "dashboard": "modules.dashboard",
+    "upload_data": "modules.upload_data",
+    "analytics": "modules.analytics",
+    "about": "modules.about",
+}
+
+_import_seconds = {}
+
+
+def load_page(name):
+    """
+    Return the page module for ``name``, importing it on first use
+    """
+    module_name = PAGE_MODULES[name]
+    first_import = module_name not in sys.modules
+    start = time.perf_counter()
+    # import_module (unlike a sys.modules lookup) waits for a module the
+    # warm-up thread (utils.warm_up) is still importing
+    module = importlib.import_module(module_name)
+    if first_import:
+        _import_seconds.setdefault(name, time.perf_counter() - start)
+    return module
+
+
+def page_import_stats():
+    """
+    Seconds each page module took to import, for the pages imported so far
+    """
+    return dict(_import_seconds)
@@ -0,0 +1,26 @@
+import hashlib
+import os
+
+from utils.lru_cache import LRUCache
+
+# Memory budget for cached scored datasets, shared by all sessions
+DEFAULT_MAX_BYTES = int(os.environ.get("EDUPREDICT_PREDICTION_CACHE_MB", "512")) * 1024 * 1024
+
+
+def make_cache_key(data, model_version):
+    """
+    Content address for an upload: hash of the raw bytes plus the model version
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    return f"{digest}:{model_version}"
+
+
+def dataframe_nbytes(df):
+    """
+    Approximate in-memory size of a DataFrame, including object columns
+    """
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+# Shared by every Streamlit session running in this process
+prediction_cache = LRUCache(DEFAULT_MAX_BYTES)
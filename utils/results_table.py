@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.data_processing import RISK_CELL_STYLES, RISK_LEVELS, bucket_risk_levels
+from utils.lru_cache import LRUCache
+
+# Rows sent to the browser per table page
+PAGE_ROWS = 100
+
+# Budget for cached row indexes; one int64 per selected student
+VIEW_INDEX_CACHE_BYTES = 64 * 1024 * 1024
+
+_view_index_cache = LRUCache(VIEW_INDEX_CACHE_BYTES)
+
+# Row filter and score order of each view; order is None (roster order),
+# "asc" or "desc"
+VIEWS = {
+    'all': (lambda scores: np.ones(len(scores), dtype=bool), None),
+    'at_risk': (lambda scores: scores < 50, "asc"),
+    'top': (lambda scores: scores >= 70, "desc"),
+}
+
+SORT_OPTIONS = {
+    "Roster order": None,
+    "Score (low to high)": "asc",
+    "Score (high to low)": "desc",
+}
+
+_NO_STYLE = np.array([''], dtype=object)
+
+
+def view_index(df, dataset_version, view, order=None):
+    """
+    Row positions of ``view`` for a scored dataset, sorted by score when
+    ``order`` (or the view's default order) asks for it.
+
+    Indexes are built with vectorized NumPy once per dataset version and
+    shared between sessions, so paging and re-sorting never touch the
+    full dataset again.
+    """
+    row_filter, default_order = VIEWS[view]
+    order = order or default_order
+    key = (dataset_version, view, order)
+    index = _view_index_cache.get(key)
+    if index is None:
+        scores = df['Predicted_Score'].to_numpy(dtype=float)
+        index = np.flatnonzero(row_filter(scores))
+        if order is not None:
+            # Stable sort keeps roster order among equal scores (NaN last)
+            ranked = scores[index] if order == "asc" else -scores[index]
+            index = index[np.argsort(ranked, kind='stable')]
+        _view_index_cache.put(key, index, index.nbytes)
+    return index
+
+
+def _risk_codes(df, rows):
+    risk_level = df['Risk_Level']
+    if isinstance(risk_level.dtype, pd.CategoricalDtype) and list(risk_level.cat.categories) == RISK_LEVELS:
+        return risk_level.cat.codes.to_numpy()[rows]
+    return bucket_risk_levels(df['Predicted_Score'].to_numpy()[rows])['codes']
+
+
+def score_cell_styles(codes, scores):
+    """
+    Cell styles for a page of scores, looked up from their risk-bucket codes
+    """
+    styles = np.asarray(RISK_CELL_STYLES, dtype=object)[codes]
+    return np.where(np.isnan(scores), _NO_STYLE, styles)
+
+
+def show_results_table(df, dataset_version, view, order=None, show_icon=False):
+    """
+    Render one page of a results view with risk-coloured scores.
+
+    Only the rows of the selected page are sliced, styled and sent to the
+    browser, so the cost does not grow with the number of students.
+    """
+    index = view_index(df, dataset_version, view, order)
+    n_pages = max(1, -(-len(index) // PAGE_ROWS))
+
+    page = 1
+    if n_pages > 1:
+        page = st.number_input(
+            f"Page (of {n_pages})",
+            min_value=1,
+            max_value=n_pages,
+            value=1,
+            key=f"results_page_{view}_{dataset_version}"
+        )
+    rows = index[(page - 1) * PAGE_ROWS:page * PAGE_ROWS]
+
+    columns = ['Student_ID', 'Predicted_Score', 'Risk_Level'] + (['Risk_Icon'] if show_icon else [])
+    # Label lookup on the page rows raises KeyError for a missing column (e.g. no Student_ID)
+    page_df = df.iloc[rows][columns].reset_index(drop=True)
+    page_df.columns = ['Student ID', 'Predicted Score', 'Risk Level'] + ([''] if show_icon else [])
+
+    cell_styles = score_cell_styles(_risk_codes(df, rows), page_df['Predicted Score'].to_numpy(dtype=float))
+    styled_df = page_df.style.apply(
+        lambda _: cell_styles,
+        subset=['Predicted Score']
+    ).format({'Predicted Score': '{:.1f}%'})
+
+    st.dataframe(styled_df, use_container_width=True, hide_index=True)
+    if len(rows):
+        first_row = (page - 1) * PAGE_ROWS + 1
+        st.caption(f"Showing students {first_row:,}-{first_row + len(rows) - 1:,} of {len(index):,}")
+    return len(index)
@@ -0,0 +1,196 @@
+import streamlit as st
+from utils.prediction_cache import prediction_cache, dataframe_nbytes
+from utils.dataset_store import dataset_store
+from utils.session_store import get_session_store, TOKEN_PARAM
+from utils.user_store import get_user_store
+
+
+def set_scored_dataset(df, version, risk_summary=None):
+    """
+    Store a scored dataset for this session and build its risk summary once
+    (unless ``risk_summary`` was already computed).
+
+    ``version`` identifies the dataset content (the prediction cache key).
+    The session keeps a handle on the shared dataset store, so sessions that
+    scored the same roster share one copy; storing the same version again
+    is a no-op, so reruns keep the summary.
+    """
+    meta = st.session_state.get('dataset_meta')
+    if meta is not None and meta['version'] == version and st.session_state.get('dataset') is not None:
+        return
+    if risk_summary is None:
+        risk_summary = _summarize_risk(df)
+    _attach(dataset_store.acquire(version, df), risk_summary)
+    st.session_state.pop('restored_session', None)
+    
+    # Remember it server-side so a browser reload can pick it up again
+    token = st.session_state.get('session_token')
+    if token and version is not None:
+        get_session_store().save_dataset(token, version, df)
+
+
+def _attach(handle, risk_summary=None):
+    """
+    Make ``handle`` this session's dataset, releasing the previous one
+    """
+    previous = st.session_state.get('dataset')
+    st.session_state.dataset = handle
+    st.session_state.dataset_meta = {
+        'df': handle.df,
+        'version': handle.version,
+        'risk_summary': risk_summary,
+        'nbytes': None,
+    }
+    if previous is not None:
+        previous.release()
+
+
+def get_scored_dataset():
+    """
+    The scored dataset for this session, or None if nothing was uploaded yet.
+
+    Returns this session's read-only view of the shared dataset. After a
+    browser reload the dataset of the restored login session is loaded
+    here, on first access: from another session holding it, the prediction
+    cache, or the session's Parquet file, in that order.
+    """
+    handle = st.session_state.get('dataset')
+    if handle is None and st.session_state.get('restored_session'):
+        record = st.session_state.pop('restored_session')
+        version = record['dataset_version']
+        handle = dataset_store.acquire(version)
+        if handle is None:
+            cached = prediction_cache.get(version)
+            df = cached['df'] if cached is not None else get_session_store().load_dataset(record)
+            if df is not None:
+                handle = dataset_store.acquire(version, df)
+        if handle is not None:
+            _attach(handle)
+    return handle.df if handle is not None else None
+
+
+def attach_finished_job():
+    """
+    Store the result of this session's background scoring job once it is
+    done, whichever page the user is on (a no-op once it is stored)
+    """
+    job = st.session_state.get('scoring_job')
+    if job is None or job.status != 'done':
+        return
+    result = job.result
+    set_scored_dataset(result['df'], job.key, result['risk_summary'])
+
+
+def release_scored_dataset():
+    """
+    Drop this session's reference to its dataset
+    """
+    handle = st.session_state.pop('dataset', None)
+    st.session_state.pop('dataset_meta', None)
+    st.session_state.pop('scoring_job', None)
+    if handle is not None:
+        handle.release()
+
+
+def _summarize_risk(df):
+    # Imported on first use: app.py loads this module for the sign-in page,
+    # which shouldn't pay for the pandas/scikit-learn stack
+    from utils.data_processing import summarize_risk
+    return summarize_risk(df)
+
+
+def begin_login_session(username):
+    """
+    Issue a session token for a freshly signed-in user and put it in the URL
+    """
+    token = get_session_store().issue(username)
+    st.session_state.session_token = token
+    st.query_params[TOKEN_PARAM] = token
+
+
+def restore_login_session():
+    """
+    Sign the user back in from the session token in the URL, if it is valid.
+
+    Returns True when a session was restored. The dataset is not read here;
+    get_scored_dataset() loads it when a page first needs it.
+    """
+    if st.session_state.get('logged_in', False):
+        return False
+    token = st.query_params.get(TOKEN_PARAM)
+    if not token:
+        return False
+    
+    store = get_session_store()
+    record = store.lookup(token)
+    user = get_user_store().get_user(record['username']) if record is not None else None
+    # Every restore swaps in a fresh token, so the one in history stops working
+    token = store.rotate(token) if user is not None else None
+    if token is None:
+        del st.query_params[TOKEN_PARAM]
+        return False
+    st.query_params[TOKEN_PARAM] = token
+    
+    st.session_state.logged_in = True
+    st.session_state.username = record['username']
+    st.session_state.user_data = user
+    st.session_state.session_token = token
+    if record['dataset_version']:
+        st.session_state.restored_session = record
+    return True
+
+
+def end_login_session():
+    """
+    Revoke this session's token so reloading no longer signs the user in,
+    and release its dataset
+    """
+    release_scored_dataset()
+    token = st.session_state.pop('session_token', None)
+    if token:
+        get_session_store().revoke(token)
+    if TOKEN_PARAM in st.query_params:
+        del st.query_params[TOKEN_PARAM]
+
+
+def _dataset_meta():
+    """
+    Per-dataset memo entry, replaced whenever the session's dataset changes
+    """
+    if get_scored_dataset() is None:
+        return None
+    return st.session_state.dataset_meta
+
+
+def get_dataset_version():
+    """
+    Content version of the session's dataset, used to key per-dataset caches
+    """
+    meta = _dataset_meta()
+    if meta is None:
+        return None
+    return meta['version']
+
+
+def get_risk_summary():
+    """
+    Memoized risk-bucket summary of the session's dataset
+    """
+    meta = _dataset_meta()
+    if meta is None or 'Predicted_Score' not in meta['df'].columns:
+        return None
+    if meta['risk_summary'] is None:
+        meta['risk_summary'] = _summarize_risk(meta['df'])
+    return meta['risk_summary']
+
+
+def get_dataset_memory():
+    """
+    Memory held by the session's dataset and how many sessions share it
+    """
+    meta = _dataset_meta()
+    if meta is None:
+        return None
+    if meta['nbytes'] is None:
+        meta['nbytes'] = dataframe_nbytes(meta['df'])
+    return {'bytes': meta['nbytes'], 'sessions': dataset_store.refs(meta['version'])}
@@ -0,0 +1,164 @@
+import hashlib
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+DB_PATH = "sessions.db"
+DATA_DIR = "session_data"
+
+# How long a login survives without signing in again. The token travels in
+# the URL (browser history, copied links), so keep this to about a school day
+SESSION_TTL_SECONDS = int(float(os.environ.get("EDUPREDICT_SESSION_TTL_HOURS", "12")) * 3600)
+
+# Query parameter that carries the token across browser reloads
+TOKEN_PARAM = "session"
+
+
+def _token_hash(token):
+    # Only hashes are stored, so a leaked database can't be replayed as logins
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class SessionStore:
+    """
+    Server-side login sessions backed by SQLite.
+
+    A token maps to a username and to the session's last scored dataset,
+    which is kept on local disk as Parquet, content-addressed by dataset
+    version so sessions that scored the same roster share one file.
+    """
+
+    def __init__(self, path=DB_PATH, data_dir=DATA_DIR, ttl=SESSION_TTL_SECONDS):
+        self.path = path
+        self.data_dir = data_dir
+        self.ttl = ttl
+        self._local = threading.local()
+        self._connection().execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                token_hash TEXT PRIMARY KEY,
+                username TEXT NOT NULL,
+                dataset_version TEXT,
+                dataset_path TEXT,
+                expires_at REAL NOT NULL
+            )
+        """)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def issue(self, username):
+        """
+        Create a session for ``username`` and return its token
+        """
+        self.purge_expired()
+        token = secrets.token_urlsafe(32)
+        self._connection().execute(
+            "INSERT INTO sessions (token_hash, username, expires_at) VALUES (?, ?, ?)",
+            (_token_hash(token), username, time.time() + self.ttl)
+        )
+        return token
+
+    def lookup(self, token):
+        """
+        Return the session record for ``token``, or None if unknown or expired
+        """
+        row = self._connection().execute(
+            "SELECT username, dataset_version, dataset_path, expires_at FROM sessions WHERE token_hash = ?",
+            (_token_hash(token),)
+        ).fetchone()
+        if row is None or row['expires_at'] < time.time():
+            return None
+        return dict(row)
+
+    def rotate(self, token):
+        """
+        Replace ``token`` with a new one for the same session and return it,
+        or None if ``token`` is unknown or expired. The old token stops
+        working, so a URL left in browser history can't be replayed.
+        """
+        new_token = secrets.token_urlsafe(32)
+        cursor = self._connection().execute(
+            "UPDATE sessions SET token_hash = ? WHERE token_hash = ? AND expires_at >= ?",
+            (_token_hash(new_token), _token_hash(token), time.time())
+        )
+        return new_token if cursor.rowcount == 1 else None
+
+    def revoke(self, token):
+        """End the session for ``token``"""
+        self._connection().execute("DELETE FROM sessions WHERE token_hash = ?", (_token_hash(token),))
+
+    def save_dataset(self, token, version, df):
+        """
+        Attach a scored dataset to the session, writing it as Parquet once per version
+        """
+        os.makedirs(self.data_dir, exist_ok=True)
+        filename = hashlib.sha256(version.encode()).hexdigest()[:32] + ".parquet"
+        path = os.path.join(self.data_dir, filename)
+        if not os.path.exists(path):
+            # Write to a temp name first so readers never see a partial file
+            tmp_path = f"{path}.{secrets.token_hex(4)}.tmp"
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        self._connection().execute(
+            "UPDATE sessions SET dataset_version = ?, dataset_path = ? WHERE token_hash = ?",
+            (version, path, _token_hash(token))
+        )
+
+    def load_dataset(self, record):
+        """
+        Read the dataset referenced by a session record, or None if it is gone
+        """
+        path = record.get('dataset_path')
+        if not path or not os.path.exists(path):
+            return None
+        # pandas is only needed once a dataset is restored, not for sign-in
+        import pandas as pd
+        return pd.read_parquet(path)
+
+    def purge_expired(self):
+        """
+        Delete expired sessions and dataset files no session refers to anymore
+        """
+        conn = self._connection()
+        conn.execute("DELETE FROM sessions WHERE expires_at < ?", (time.time(),))
+        if not os.path.isdir(self.data_dir):
+            return
+        referenced = {
+            os.path.basename(row[0])
+            for row in conn.execute("SELECT DISTINCT dataset_path FROM sessions WHERE dataset_path IS NOT NULL")
+        }
+        cutoff = time.time() - 3600
+        for filename in os.listdir(self.data_dir):
+            path = os.path.join(self.data_dir, filename)
+            if filename in referenced or not filename.endswith(".parquet"):
+                continue
+            try:
+                # Skip fresh files: their session row may not point at them yet
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_session_store():
+    """
+    Process-wide session store, opened on first use
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SessionStore()
+    return _store
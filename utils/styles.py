@@ -1,9 +1,10 @@
+import functools
+import hashlib
+import re
+
 import streamlit as st
 
-def load_css():
-    """Load custom CSS styles for the application"""
-    st.markdown("""
-    <style>
+STYLESHEET = """
         /* Import Google Fonts */
         @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
         
@@ -354,5 +355,71 @@ def load_css():
                 grid-template-columns: 1fr;
             }
         }
-    </style>
-    """, unsafe_allow_html=True)
\ No newline at end of file
+"""
+
+
+
+def _minify_css(css):
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+
+@functools.lru_cache(maxsize=None)
+def _compiled_stylesheet():
+    css = _minify_css(STYLESHEET)
+    content_hash = hashlib.sha256(css.encode()).hexdigest()[:12]
+    return content_hash, f'<style id="edupredict-css-{content_hash}">{css}</style>'
+
+
+def css_hash():
+    """Content hash of the minified stylesheet"""
+    return _compiled_stylesheet()[0]
+
+
+def get_css():
+    """The application's stylesheet, minified and hashed once per process"""
+    return _compiled_stylesheet()[1]
+
+
+def load_css():
+    """
+    Load custom CSS styles for the application.
+
+    The markup is byte-identical on every rerun, so once the browser has it
+    cached Streamlit sends only a reference to it (see
+    global.minCachedMessageSize in .streamlit/config.toml).
+    """
+    st.markdown(get_css(), unsafe_allow_html=True)
+
+
+# Card templates, filled in with values on each rerun
+_METRIC_CARD = (
+    '<div class="metric-card"><div class="metric-value"{style}>{value}</div>'
+    '<div class="metric-label">{label}</div></div>'
+)
+_INFO_CARD = '<div class="{classes}"><{heading}>{title}</{heading}>{body}</div>'
+_CARD_LIST = '<ul style="text-align: left; margin-left: 1rem;">{items}</ul>'
+
+
+@functools.lru_cache(maxsize=1024)
+def metric_card(value, label, color=None):
+    """
+    HTML for a metric card, e.g. metric_card(12, "High Risk", "#ef4444")
+    """
+    style = f' style="color: {color};"' if color else ""
+    return _METRIC_CARD.format(style=style, value=value, label=label)
+
+
+def info_card(title, *paragraphs, variant=None, items=(), heading="h4"):
+    """
+    HTML for an info card; ``variant`` is "success", "warning" or "danger"
+    and ``items`` are rendered as a bullet list after the paragraphs
+    """
+    classes = f"info-card {variant}-card" if variant else "info-card"
+    body = "".join(f"<p>{paragraph}</p>" for paragraph in paragraphs)
+    if items:
+        body += _CARD_LIST.format(items="".join(f"<li>{item}</li>" for item in items))
+    return _INFO_CARD.format(classes=classes, heading=heading, title=title, body=body)
@@ -0,0 +1,135 @@
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+DB_PATH = "users.db"
+LEGACY_USERS_FILE = "users.json"
+
+SCHEMA_VERSION = 1
+
+USER_FIELDS = ["password", "email", "first_name", "last_name", "role", "created_at"]
+
+
+class UserStore:
+    """
+    User accounts in a local SQLite database.
+
+    Usernames are the primary key and emails are indexed, so sign-in and
+    duplicate checks are B-tree lookups, and a signup is a single-row
+    insert. On first use the existing users.json is migrated into the
+    database once.
+    """
+
+    def __init__(self, path=DB_PATH, legacy_json=LEGACY_USERS_FILE):
+        self.path = path
+        self.legacy_json = legacy_json
+        self._local = threading.local()
+        self._migrate()
+
+    def _connection(self):
+        # sqlite3 connections can't be shared between Streamlit's session threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _migrate(self):
+        """
+        Create the schema and import users.json, exactly once per database
+        """
+        conn = self._connection()
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have migrated while we waited for the lock
+            if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+                conn.execute("COMMIT")
+                return
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS users (
+                    username TEXT PRIMARY KEY,
+                    password TEXT NOT NULL,
+                    email TEXT NOT NULL,
+                    first_name TEXT,
+                    last_name TEXT,
+                    role TEXT,
+                    created_at TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_users_email ON users (email)")
+
+            legacy = Path(self.legacy_json)
+            if legacy.exists():
+                with open(legacy, "r") as f:
+                    users = json.load(f)
+                conn.executemany(
+                    "INSERT OR IGNORE INTO users (username, password, email, first_name, last_name, role, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(username, *(record.get(field) for field in USER_FIELDS))
+                     for username, record in users.items()]
+                )
+
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get_user(self, username):
+        """
+        Return the user record for ``username`` (same fields as users.json) or None
+        """
+        row = self._connection().execute(
+            "SELECT password, email, first_name, last_name, role, created_at FROM users WHERE username = ?",
+            (username,)
+        ).fetchone()
+        return dict(row) if row is not None else None
+
+    def email_exists(self, email):
+        """Check whether an account already uses ``email``"""
+        row = self._connection().execute(
+            "SELECT 1 FROM users WHERE email = ? LIMIT 1", (email,)
+        ).fetchone()
+        return row is not None
+
+    def create_user(self, username, record):
+        """
+        Insert a new user; returns (created, message).
+
+        The username and email checks happen inside the insert itself, so two
+        concurrent signups can't both claim the same username or email.
+        """
+        conn = self._connection()
+        try:
+            cursor = conn.execute(
+                "INSERT INTO users (username, password, email, first_name, last_name, role, created_at) "
+                "SELECT ?, ?, ?, ?, ?, ?, ? WHERE NOT EXISTS (SELECT 1 FROM users WHERE email = ?)",
+                (username, *(record.get(field) for field in USER_FIELDS), record.get("email"))
+            )
+        except sqlite3.IntegrityError:
+            return False, "Username already exists"
+        if cursor.rowcount == 0:
+            return False, "Email already registered"
+        return True, "Account created"
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_user_store():
+    """
+    Process-wide user store, opened (and migrated) on first use
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = UserStore()
+    return _store
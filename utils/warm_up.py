@@ -0,0 +1,166 @@
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.page_registry import PAGE_MODULES, load_page
+
+# Set to 0 to skip the warm-up (pages, model and chart stack load on first use)
+WARM_UP = os.environ.get("EDUPREDICT_WARM_UP", "1") != "0"
+
+logger = logging.getLogger(__name__)
+
+
+def _import_pages():
+    for name in PAGE_MODULES:
+        load_page(name)
+
+
+def _load_model():
+    from utils.data_processing import MODEL_PATH, PREPROCESSOR_PATH
+    from utils.model_registry import registry
+    registry.get(MODEL_PATH)
+    if os.path.exists(PREPROCESSOR_PATH):
+        registry.get(PREPROCESSOR_PATH)
+
+
+def _first_predict():
+    # The first predict pays for scikit-learn's lazy validation setup
+    from utils.data_processing import (
+        MODEL_PATH, bucket_risk_levels, create_sample_data, make_predictions, preprocess_data
+    )
+    from utils.model_registry import registry
+    scores = make_predictions(preprocess_data(create_sample_data(16)), registry.get(MODEL_PATH))
+    bucket_risk_levels(scores)
+
+
+def _matplotlib():
+    # Builds matplotlib's font cache and the Agg renderer
+    from utils.figure_renderer import render_png
+
+    def draw(fig):
+        ax = fig.subplots()
+        ax.bar(["a", "b"], [1, 2])
+        ax.set_title("warm-up")
+
+    render_png(draw, figsize=(2, 2))
+
+
+def _plotly():
+    # Loads the default template and the JSON encoder Streamlit serializes figures with
+    from utils.charts import score_histogram_figure
+    score_histogram_figure([40.0, 55.0, 70.0], nbins=5, title="warm-up").to_json()
+
+
+def _css():
+    from utils.styles import get_css
+    get_css()
+
+
+WARM_UP_STEPS = [
+    ("pages", _import_pages),
+    ("model", _load_model),
+    ("first_predict", _first_predict),
+    ("matplotlib", _matplotlib),
+    ("plotly", _plotly),
+    ("css", _css),
+]
+
+
+class WarmUp:
+    """
+    Runs the warm-up steps once and records how long each took.
+
+    The instance is ready once every step has finished without error; a
+    failed step (e.g. a missing model.pkl) keeps it not ready.
+    """
+
+    def __init__(self, steps=WARM_UP_STEPS):
+        self.steps = steps
+        self.timings = {}
+        self.errors = {}
+        self.finished = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self.finished.is_set() and not self.errors
+
+    def start(self):
+        """
+        Start the warm-up on a background thread; later calls do nothing
+        """
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.run, name="warm-up", daemon=True)
+                self._thread.start()
+
+    def run(self):
+        for name, step in self.steps:
+            start = time.perf_counter()
+            try:
+                step()
+            except Exception as e:
+                self.errors[name] = str(e)
+                logger.warning("Warm-up step %s failed: %s", name, e)
+            self.timings[name] = time.perf_counter() - start
+        self.finished.set()
+        logger.info("Warm-up finished in %.2fs", sum(self.timings.values()))
+
+    def status(self):
+        """
+        Readiness and per-step timings, as reported by the readiness endpoint
+        """
+        return {
+            'ready': self.ready,
+            'finished': self.finished.is_set(),
+            'timings_seconds': {name: round(seconds, 4) for name, seconds in self.timings.items()},
+            'errors': dict(self.errors),
+        }
+
+
+# One warm-up per server process
+warm_up = WarmUp()
+
+
+def start_warm_up():
+    """
+    Warm the process up in the background, unless EDUPREDICT_WARM_UP=0
+    """
+    if WARM_UP:
+        warm_up.start()
+
+
+class ReadinessHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/ready":
+            status = 200 if warm_up.ready else 503
+        elif self.path == "/warmup":
+            status = 200
+        else:
+            self.send_error(404)
+            return
+        body = json.dumps(warm_up.status()).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Load balancer probes would flood the server log
+        pass
+
+
+def start_readiness_server(host, port):
+    """
+    Serve GET /ready (200 once warmed up, 503 before) and GET /warmup
+    (step timings) on a daemon thread
+    """
+    server = ThreadingHTTPServer((host, port), ReadinessHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="readiness", daemon=True).start()
+    return server